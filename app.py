@@ -1,14 +1,26 @@
+import time
+run_started = time.perf_counter()
 import streamlit as st
 st.set_page_config(page_title="CinéCreuse+", layout="wide")
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 import random
-import joblib
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler
+from cinecreuse import recsys
+from cinecreuse.catalog import poster_url
+from cinecreuse.diskcache import DiskCache
+from cinecreuse.facets import CatalogFacets
+from cinecreuse.kpi import catalog_kpis
+from cinecreuse.posters import PosterCache
+from cinecreuse.browse import CATALOG_PAGE_SIZES, filter_positions, page_count, page_slice, sort_positions
+from cinecreuse.bundle import current_version
+from cinecreuse.cards import CardCache, poster_img_html
+from cinecreuse.ingest import ensure_bundle
+from cinecreuse.shared import CatalogView, SharedCatalog
+from cinecreuse.toplists import HOME_GENRES, HOME_TOP_N, POPULAR_TOP_N
+from cinecreuse.warmup import WarmUp, status_path
+from components.carousel import carousel
 
 # Configuration de la page
 st.set_page_config(
@@ -23,295 +35,191 @@ if 'first_load' not in st.session_state:
     st.session_state['first_load'] = True
 
 @st.cache_resource
+def _load_knn_model():
+    """Modèle KNN, une fois par processus (une erreur n'est pas mise en cache et remonte au préchauffage)"""
+    return recsys.load_model()
+
 def load_knn_model():
     """Charge le modèle KNN pour les recommandations"""
     try:
-        model = joblib.load('attached_assets/knn_model_1749778773406.joblib')
-        return model
+        return _load_knn_model()
     except Exception as e:
         st.error(f"Erreur lors du chargement du modèle KNN: {e}")
         return None
 
-@st.cache_data
-def prepare_features_for_knn(df):
-    """Prépare les features pour le modèle KNN"""
-    try:
-        # Créer des features numériques pour le modèle
-        features_df = df.copy()
-        
-        # Encodage des genres (one-hot encoding simplifié)
-        all_genres = set()
-        for genres in df['genres_x'].str.split(','):
-            if isinstance(genres, list):
-                all_genres.update([g.strip() for g in genres])
-        
-        # Créer des colonnes binaires pour chaque genre
-        for genre in all_genres:
-            if genre and genre != 'nan':
-                features_df[f'genre_{genre}'] = df['genres_x'].str.contains(genre, na=False).astype(int)
-        
-        # Features numériques (utiliser les colonnes disponibles)
-        numeric_features = []
-        if 'averageRating' in df.columns:
-            numeric_features.append('averageRating')
-        if 'runtime' in df.columns:
-            numeric_features.append('runtime')
-        if 'year' in df.columns:
-            numeric_features.append('year')
-        if 'numVotes' in df.columns:
-            numeric_features.append('numVotes')
-        if 'vote_average' in df.columns:
-            numeric_features.append('vote_average')
-        if 'vote_count' in df.columns:
-            numeric_features.append('vote_count')
-        if 'popularity' in df.columns:
-            numeric_features.append('popularity')
-        
-        # Combiner toutes les features
-        feature_columns = numeric_features + [col for col in features_df.columns if col.startswith('genre_')]
-        features_matrix = features_df[feature_columns].fillna(0)
-        
-        return features_matrix, feature_columns
-    except Exception as e:
-        st.error(f"Erreur lors de la préparation des features: {e}")
-        return None, None
+@st.cache_resource
+def load_catalog_bundle():
+    """Ouvre et mappe le bundle d'artefacts du catalogue (reconstruit s'il est absent ou périmé)"""
+    return ensure_bundle().attach()
 
-def find_movie_by_name(movie_title, df):
-    """Trouve un film par son nom avec recherche flexible"""
-    if not movie_title or movie_title.strip() == "":
+@st.cache_resource
+def load_derived_cache():
+    """Cache disque des agrégats de la page KPI, partagé entre redémarrages et entre workers"""
+    return DiskCache()
+
+def cached_derived(func, *args, **params):
+    """Calcule func sur le catalogue courant, ou relit le résultat déjà enregistré sur disque"""
+    return load_derived_cache().get_or_compute(func, load_catalog_bundle().content_hash, *args, **params)
+
+def load_top_movies(n):
+    """Positions des n films les mieux notés du catalogue (précalculées dans le bundle)"""
+    return load_catalog_bundle().top_rated[:n]
+
+def load_genre_top_lists(genres, n):
+    """Positions des n films les mieux notés de chaque genre (précalculées dans le bundle)"""
+    bundle = load_catalog_bundle()
+    return {genre: bundle.genre_top(genre, n) for genre in genres}
+
+@st.cache_resource
+def load_catalog_kpis():
+    """Indicateurs agrégés du catalogue pour la page KPI"""
+    return cached_derived(catalog_kpis, catalog_frame())
+
+@st.cache_resource(max_entries=32)
+def load_search_positions(version, synopsis_query):
+    """Positions des films dont le synopsis correspond à la recherche, par pertinence décroissante (None sans index)"""
+    synopsis_index = load_synopsis_index()
+    if synopsis_index is None:
         return None
-    
-    movie_title = movie_title.strip().lower()
-    
-    # Recherche exacte
-    exact_match = df[df['title_x'].str.lower() == movie_title]
-    if not exact_match.empty:
-        return exact_match.iloc[0]
-    
-    # Recherche partielle
-    partial_match = df[df['title_x'].str.lower().str.contains(movie_title, na=False)]
-    if not partial_match.empty:
-        return partial_match.iloc[0]
-    
-    return None
+    positions, _ = synopsis_index.search(synopsis_query, top_k=None)
+    positions.flags.writeable = False
+    return positions
+
+@st.cache_resource(max_entries=64)
+def load_catalog_positions(version, synopsis_query, genre, year, sort_column, ascending):
+    """Positions des films filtrés et triés pour un état des filtres du Catalogue (version dans la clé)"""
+    positions = load_search_positions(version, synopsis_query) if synopsis_query else None
+    positions = filter_positions(load_catalog_bundle(), catalog_frame(), genre, year, positions)
+    if sort_column != "search_score":
+        positions = sort_positions(catalog_frame(), positions, sort_column, ascending)
+    positions.flags.writeable = False
+    return positions
 
-def get_simple_recommendations(movie_data, df, n_recommendations=5):
-    """Système de recommandation simple basé sur les genres et notes"""
+@st.cache_resource
+def load_catalog_facets():
+    """Vocabulaires et bitmaps des facettes genre et année du catalogue courant"""
+    return CatalogFacets.build(load_catalog_bundle(), catalog_frame())
+
+@st.cache_resource
+def _load_synopsis_index():
+    """Index BM25 des synopsis du bundle, une fois par processus"""
+    return load_catalog_bundle().synopsis_index()
+
+def load_synopsis_index():
+    """Charge l'index BM25 des synopsis depuis le bundle"""
     try:
-        # Extraire les informations du film de référence
-        movie_genres = str(movie_data.get('genres_x', '')).lower()
-        
-        # Utiliser la note disponible (priorité à averageRating, sinon vote_average)
-        movie_rating = movie_data.get('averageRating', movie_data.get('vote_average', 5.0))
-        
-        # Extraire l'année (de year ou de release_date)
-        movie_year = movie_data.get('year', 2000)
-        if pd.isna(movie_year) and 'release_date' in movie_data:
-            try:
-                movie_year = pd.to_datetime(movie_data['release_date']).year
-            except:
-                movie_year = 2000
-        
-        # Calculer un score de similarité pour chaque film
-        scores = []
-        for idx, row in df.iterrows():
-            try:
-                if row['title_x'] == movie_data['title_x']:
-                    continue  # Exclure le film lui-même
-                
-                score = 0
-                
-                # Similarité de genre (poids 50%)
-                row_genres = str(row.get('genres_x', '')).lower()
-                if movie_genres and row_genres and movie_genres != 'nan' and row_genres != 'nan':
-                    movie_genre_list = [g.strip() for g in movie_genres.split(',')]
-                    common_genres = 0
-                    for genre in movie_genre_list:
-                        if genre and genre in row_genres:
-                            common_genres += 1
-                    if common_genres > 0:
-                        score += (common_genres / len(movie_genre_list)) * 0.5
-                
-                # Similarité de note (poids 30%)
-                row_rating = row.get('averageRating', row.get('vote_average', 5.0))
-                if pd.notna(row_rating) and pd.notna(movie_rating):
-                    rating_diff = abs(float(movie_rating) - float(row_rating))
-                    rating_score = max(0, 1 - rating_diff / 10) * 0.3
-                    score += rating_score
-                
-                # Similarité d'époque (poids 20%)
-                row_year = row.get('year', 2000)
-                if pd.isna(row_year) and 'release_date' in row:
-                    try:
-                        row_year = pd.to_datetime(row['release_date']).year
-                    except:
-                        row_year = 2000
-                
-                if pd.notna(row_year) and pd.notna(movie_year):
-                    year_diff = abs(int(movie_year) - int(row_year))
-                    year_score = max(0, 1 - year_diff / 50) * 0.2
-                    score += year_score
-                
-                scores.append((idx, score))
-                
-            except Exception as row_error:
-                continue  # Ignorer les erreurs sur des lignes individuelles
-        
-        # Trier par score et prendre les meilleurs
-        if scores:
-            scores.sort(key=lambda x: x[1], reverse=True)
-            top_indices = [idx for idx, score in scores[:n_recommendations] if score > 0]
-            if top_indices:
-                return df.iloc[top_indices].to_dict('records')
-        
-        # Si aucune recommandation trouvée, retourner des films populaires du même genre
-        if movie_genres and movie_genres != 'nan':
-            genre_filter = df[df['genres_x'].str.contains(movie_genres.split(',')[0].strip(), na=False, case=False)]
-            if not genre_filter.empty:
-                return genre_filter.head(n_recommendations).to_dict('records')
-        
-        return []
-    
+        return _load_synopsis_index()
     except Exception as e:
-        st.error(f"Erreur lors de la génération des recommandations: {e}")
-        return []
+        st.error(f"Erreur lors du chargement de l'index des synopsis: {e}")
+        return None
+
+def get_synopsis(movie_id):
+    """Lit le synopsis d'un film à la demande dans le blob du bundle"""
+    try:
+        return load_catalog_bundle().synopsis(movie_id)
+    except Exception:
+        return None
+
+def find_movie_by_name(movie_title, df):
+    """Trouve un film par son nom avec recherche flexible (index des titres du bundle)"""
+    return recsys.find_movie_by_name(movie_title, df, load_catalog_bundle())
 
 def get_knn_recommendations(movie_title, df, model, n_recommendations=5):
     """Obtient des recommandations basées sur le modèle KNN avec fallback"""
     try:
-        # Trouver le film
-        movie_data = find_movie_by_name(movie_title, df)
-        if movie_data is None:
-            return []
-        
-        # Essayer d'abord le modèle KNN
-        if model is not None:
-            try:
-                # Préparer les features
-                features_matrix, feature_columns = prepare_features_for_knn(df)
-                if features_matrix is not None:
-                    # Obtenir l'index du film trouvé
-                    movie_idx = movie_data.name
-                    movie_features = features_matrix.iloc[movie_idx:movie_idx+1]
-                    
-                    # Utiliser le modèle KNN
-                    distances, indices = model.kneighbors(movie_features, n_neighbors=n_recommendations+1)
-                    recommended_indices = indices[0][1:]  # Exclure le film lui-même
-                    recommended_movies = df.iloc[recommended_indices]
-                    
-                    return recommended_movies.to_dict('records')
-            except Exception as knn_error:
-                pass  # Utiliser silencieusement le système de recommandation alternatif
-        
-        # Utiliser le système de recommandation simple comme fallback
-        return get_simple_recommendations(movie_data, df, n_recommendations)
-        
+        return recsys.get_knn_recommendations(movie_title, df, load_catalog_bundle(), model, n_recommendations)
     except Exception as e:
         st.error(f"Erreur lors de la génération des recommandations: {e}")
         return []
 
-@st.cache_data
+@st.cache_resource
+def _load_movies():
+    """Catalogue partagé en lecture seule (une seule instance par processus, sans copie par rerun)"""
+    return SharedCatalog(load_catalog_bundle())
+
 def load_movies():
-    """Charge et nettoie les données des films"""
+    """Charge le catalogue partagé (None, avec un message, si le chargement échoue)"""
     try:
-        # Charger le nouveau fichier CSV
-        df = pd.read_csv('attached_assets/df_main_cleaned_1749777540074.csv')
-        
-        # 1. Mapper les colonnes vers les noms attendus par l'application
-        if 'title' in df.columns and 'title_x' not in df.columns:
-            df['title_x'] = df['title']
-        if 'genres' in df.columns and 'genres_x' not in df.columns:
-            df['genres_x'] = df['genres']
-        if 'overview' in df.columns and 'description' not in df.columns:
-            df['description'] = df['overview']
-        
-        # Créer la colonne year à partir de release_date
-        if 'release_date' in df.columns and 'year' not in df.columns:
-            df['year'] = pd.to_datetime(df['release_date'], errors='coerce').dt.year
-            df['year'] = df['year'].fillna(2000).astype(int)  # Valeur par défaut si date manquante
-        
-        # S'assurer que poster_url existe
-        if 'poster_path' in df.columns and 'poster_url' not in df.columns:
-            df['poster_url'] = 'https://image.tmdb.org/t/p/w500' + df['poster_path'].astype(str)
-            df.loc[df['poster_path'].isna(), 'poster_url'] = None
-        
-        # 2. Gestion des valeurs manquantes pour les colonnes critiques
-        df['title_x'] = df['title_x'].fillna('Titre non disponible')
-        df['genres_x'] = df['genres_x'].fillna('Inconnu')
-        if 'description' in df.columns:
-            df['description'] = df['description'].fillna('Aucune description disponible')
-        elif 'overview' in df.columns:
-            df['description'] = df['overview'].fillna('Aucune description disponible')
-        
-        df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
-        df['year'] = df['release_date'].dt.year
-        
-        # 3. Nettoyer les colonnes numériques
-        numeric_columns = ['runtime', 'averageRating', 'numVotes']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                df[col] = df[col].fillna(0)
-        
-        # 3. Créer l'URL du poster si elle n'existe pas
-        if 'poster_url' not in df.columns:
-            base_url = "https://image.tmdb.org/t/p/w500"
-            df['poster_url'] = df['poster_path'].apply(
-                lambda x: f"{base_url}{x}" if pd.notna(x) and str(x).startswith('/') else None
-            )
-        
-        # 4. Nettoyer les genres (enlever les crochets et guillemets)
-        df['genres_x'] = df['genres_x'].astype(str)
-        df['genres_x'] = df['genres_x'].str.replace(r'[\[\]\'"]', '', regex=True)
-        df['genres_x'] = df['genres_x'].str.replace(r'\s+', ' ', regex=True)
-        
-        # 5. Filtrer les données
-        df = df.drop_duplicates(subset=['title_x', 'release_date'], keep='first')
-        df = df.dropna(subset=['title_x', 'genres_x', 'runtime', 'averageRating'])
-        df = df[df['runtime'] > 0]
-        df = df[df['averageRating'] > 0]
-        
-        # 6. Conserver uniquement les colonnes utiles disponibles
-        available_columns = df.columns.tolist()
-        columns_to_keep = []
-        for col in ['title_x', 'original_language', 'release_date', 'year', 'genres_x', 
-                   'description', 'poster_path', 'poster_url', 'runtime', 'averageRating', 'numVotes']:
-            if col in available_columns:
-                columns_to_keep.append(col)
-        
-        df = df[columns_to_keep]
-        
-        return df
-        
+        return _load_movies()
     except Exception as e:
         st.error(f"Erreur lors du chargement des données: {e}")
-        return pd.DataFrame()
+        return None
 
-def create_poster_with_play_button(poster_url, title, unique_id):
-    """Crée le HTML pour une affiche avec bouton play au survol"""
-    return f'''
+@st.cache_resource
+def load_card_cache():
+    """Cache du HTML des cartes de films, partagé par toutes les sessions (vidé au rechargement du catalogue)"""
+    return CardCache()
+
+@st.cache_resource
+def load_poster_cache():
+    """Cache local des vignettes d'affiches, servi par les fichiers statiques de Streamlit"""
+    return PosterCache()
+
+def show_poster(poster_path, title, width):
+    """Affiche d'un film à `width` pixels : vignette locale (ou taille TMDB équivalente), sinon URL d'origine
+
+    Retourne False si le film n'a pas d'affiche.
+    """
+    image = load_poster_cache().image(poster_path)
+    if image is not None:
+        src, sources, color = image
+        st.markdown(poster_img_html(src, title, width, sources, color), unsafe_allow_html=True)
+        return True
+    url = poster_url(poster_path)
+    if url:
+        st.image(url, width=width)
+        return True
+    return False
+
+def render_movie_grid(positions, variant, n_columns, extra_details=()):
+    """Affiche toute une grille de cartes en un seul élément HTML
+
+    Le contenu de chaque carte vient du cache (movie_id, variante, version du catalogue) ;
+    `extra_details` ajoute des colonnes de lignes HTML propres à ce rendu (une chaîne par film).
+    """
+    bodies = load_card_cache().cards(
+        catalog_view(), positions, variant, load_catalog_bundle().version, posters=load_poster_cache()
+    )
+    cards = ''.join(
+        f'<div class="movie-card">{body}'
+        + ''.join(f'<div class="card-detail">{detail}</div>' for detail in details)
+        + '</div>'
+        for body, *details in zip(bodies, *extra_details)
+    )
+    st.markdown(
+        f'<div class="movie-grid" style="grid-template-columns: repeat({n_columns}, minmax(0, 1fr));">{cards}</div>',
+        unsafe_allow_html=True
+    )
+
+def add_poster_styles():
+    """Ajoute une seule fois par page les styles communs à toutes les affiches"""
+    st.markdown("""
     <style>
-    .poster-{unique_id} {{
+    .poster {
         position: relative;
+        width: 180px;
+        aspect-ratio: 2 / 3;
+        background: #333;
         transition: transform 0.3s ease, box-shadow 0.3s ease, filter 0.3s ease;
         cursor: pointer;
         border-radius: 8px;
         overflow: hidden;
         display: block;
-    }}
-    .poster-{unique_id}:hover {{
+    }
+    .poster:hover {
         transform: scale(1.25);
         box-shadow: 0 20px 50px rgba(0,0,0,0.9);
         filter: brightness(1.2) contrast(1.1);
         z-index: 100;
-    }}
-    .poster-{unique_id} img {{
+    }
+    .poster img {
         width: 100%;
-        height: auto;
+        height: 100%;
+        object-fit: cover;
         border-radius: 8px;
         display: block;
-    }}
-    .play-button-{unique_id} {{
+    }
+    .poster .play-button {
         position: absolute;
         top: 50%;
         left: 50%;
@@ -329,18 +237,93 @@ def create_poster_with_play_button(poster_url, title, unique_id):
         align-items: center;
         justify-content: center;
         color: #333;
-    }}
-    .poster-{unique_id}:hover .play-button-{unique_id} {{
+    }
+    .poster:hover .play-button {
         opacity: 1;
-    }}
+    }
+    .poster-placeholder {
+        height: 270px;
+        width: 180px;
+        background: #333;
+        border-radius: 8px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: white;
+        margin: 0 auto;
+    }
+    .poster-placeholder.cinema {
+        height: 200px;
+        width: 100%;
+        margin-bottom: 10px;
+    }
+    .movie-grid {
+        display: grid;
+        gap: 24px 16px;
+        margin-bottom: 16px;
+    }
+    .movie-card .poster {
+        max-width: 100%;
+    }
+    .movie-card .card-title {
+        font-weight: 600;
+        font-size: 14px;
+        margin-top: 6px;
+    }
+    .movie-card .card-detail {
+        font-size: 14px;
+        opacity: 0.7;
+    }
     </style>
-    <div class="poster-{unique_id}">
-        <img src="{poster_url}" alt="{title}" style="width: 180px; border-radius: 8px;">
-        <div class="play-button-{unique_id}">▶</div>
-    </div>
-    '''
+    """, unsafe_allow_html=True)
 
 # Ajouter le CSS global pour les boutons de navigation
+@st.cache_resource
+def render_timings():
+    """Durées des derniers rendus par type, partagées par toutes les sessions du processus"""
+    return defaultdict(lambda: deque(maxlen=200))
+
+def record_timing(kind, seconds):
+    render_timings()[kind].append(seconds)
+
+def open_recommendations(movie_id):
+    """Ouvre la page Recommandation pré-remplie avec le titre du film cliqué"""
+    movie = catalog_view().by_id(movie_id, ('title_x',))
+    if movie is not None:
+        st.session_state['reco_title'] = movie['title_x']
+        st.session_state['page'] = "Recommandation"
+        st.rerun(scope="app")
+
+@st.fragment
+def render_carousel(positions, key, movies_per_page, n_columns, total_pages=3):
+    """Carrousel paginé dans le navigateur : ◀/▶ ne sollicitent pas le serveur, seul un clic sur une affiche y revient"""
+    started = time.perf_counter()
+    poster_cache = load_poster_cache()
+    items = []
+    for movie_id, title, rating, poster_path in catalog_view().rows(
+        positions, ('movie_id', 'title_x', 'averageRating', 'poster_path')
+    ):
+        poster_src, poster_srcset, poster_color = poster_cache.image(poster_path) or (None, None, None)
+        items.append({
+            'movie_id': movie_id,
+            'title': title,
+            'rating': round(rating, 1) if pd.notna(rating) else None,
+            'poster_url': poster_src,
+            'poster_srcset': poster_srcset,
+            'poster_color': poster_color,
+        })
+    selected = carousel(items, key=f"carousel_{key}", per_page=movies_per_page, n_columns=n_columns,
+                        total_pages=total_pages)
+    record_timing("Carrousel seul (rerun de fragment)", time.perf_counter() - started)
+    
+    # Le composant renvoie sa dernière valeur à chaque rerun : seul un nouveau clic est traité
+    if selected and selected.get('nonce') != st.session_state.get(f"{key}_clicked"):
+        st.session_state[f"{key}_clicked"] = selected['nonce']
+        open_recommendations(selected['movie_id'])
+
+def shift_catalog_page(step):
+    st.session_state['catalog_page'] += step
+
 def add_navigation_button_styles():
     """Ajoute les styles CSS pour les boutons de navigation"""
     st.markdown("""
@@ -433,8 +416,72 @@ def add_navigation_button_styles():
     </style>
     """, unsafe_allow_html=True)
 
-# Charger les données
-df_main = load_movies()
+def clear_catalog_caches():
+    """Vide tous les caches dérivés du catalogue"""
+    st.cache_data.clear()
+    load_catalog_bundle.clear()
+    _load_movies.clear()
+    _load_synopsis_index.clear()
+    load_search_positions.clear()
+    load_catalog_positions.clear()
+    load_catalog_facets.clear()
+    load_card_cache.clear()
+    load_catalog_kpis.clear()
+    start_warm_up.clear()
+
+def catalog_frame():
+    """Catalogue partagé, en copie superficielle propre au rerun (vide si le chargement a échoué)"""
+    shared_catalog = load_movies()
+    return shared_catalog.frame if shared_catalog is not None else pd.DataFrame()
+
+def catalog_view():
+    """Vue colonnaire en lecture seule du catalogue partagé, pour les boucles d'affichage"""
+    shared_catalog = load_movies()
+    return shared_catalog.view if shared_catalog is not None else CatalogView(pd.DataFrame())
+
+@st.cache_resource
+def start_warm_up():
+    """Précharge bundle, catalogue, modèle, index et listes de l'accueil en arrière-plan, une fois par processus
+
+    L'état est écrit dans le fichier d'état du port du serveur, lu par la sonde
+    `python -m cinecreuse.warmup --check --port N`.
+    """
+    return WarmUp([
+        ('catalogue', _load_movies),
+        ('modele', _load_knn_model),
+        ('index_synopsis', _load_synopsis_index),
+        ('accueil', lambda: load_genre_top_lists(HOME_GENRES.values(), HOME_TOP_N)),
+        ('facettes', load_catalog_facets),
+        ('kpi', load_catalog_kpis),
+    ], status_path=status_path(st.get_option('server.port'))).start()
+
+def refresh_catalog_if_updated(warm_up):
+    """Vide les caches du catalogue si une nouvelle version a été publiée (ex. ingestion incrémentale)
+
+    Tant que le préchauffage tourne, c'est lui qui ouvre (ou reconstruit) le bundle : rien à comparer.
+    Retourne True si les caches ont été vidés.
+    """
+    if not warm_up.is_ready:
+        return False
+    try:
+        if load_catalog_bundle().version != current_version():
+            clear_catalog_caches()
+            return True
+    except Exception:
+        pass  # L'erreur de chargement est affichée par load_movies()
+    return False
+
+# Le préchauffage démarre avant tout chargement : l'ouverture du bundle se fait dans son thread
+warm_up = start_warm_up()
+if refresh_catalog_if_updated(warm_up):
+    warm_up = start_warm_up()
+
+# Charger les données (les chargements en cours dans le préchauffage sont attendus, pas refaits)
+if warm_up.is_ready:
+    df_main = catalog_frame()
+else:
+    with st.spinner("Préparation du catalogue..."):
+        df_main = catalog_frame()
 
 # Appliquer les styles pour les boutons de navigation
 add_navigation_button_styles()
@@ -480,183 +527,23 @@ if page == "Accueil":
     st.subheader("À la une cette semaine")
     
     if not df_main.empty:
-        # Sélectionner les 18 meilleurs films par note et popularité
-        featured_movies = df_main.nlargest(18, 'averageRating')
-        
-        # Système de pagination : 6 films par page, 3 pages maximum
-        movies_per_page = 6
-        total_pages = 3
-        
-        # État de pagination pour cette section
-        if "featured_page" not in st.session_state:
-            st.session_state["featured_page"] = 0
-        
-        current_page = st.session_state["featured_page"]
-        
-        # Navigation avec boutons alignés dynamiquement
-        start_idx = current_page * movies_per_page
-        end_idx = min(start_idx + movies_per_page, len(featured_movies))
-        page_movies = featured_movies.iloc[start_idx:end_idx]
-        
-        if current_page > 0:
-            # Mode normal avec boutons des deux côtés
-            col_nav1, col_movies, col_nav2 = st.columns([1, 10, 1])
-            
-            with col_nav1:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if st.button("◀", key="prev_featured"):
-                    st.session_state["featured_page"] -= 1
-                    st.rerun()
-            
-            with col_nav2:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if current_page < total_pages - 1:
-                    if st.button("▶", key="next_featured"):
-                        st.session_state["featured_page"] += 1
-                        st.rerun()
-            
-            with col_movies:
-                # Afficher films avec colonnes centrées
-                cols = st.columns(6)
-                for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                    with cols[idx]:
-                        if movie['poster_url']:
-                            unique_id = f"featured_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                            poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                        st.caption(f"**{movie['title_x']}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10")
-        else:
-            # Mode première page - alignement à gauche
-            col_movies, col_nav2 = st.columns([10, 1])
-            
-            with col_nav2:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if current_page < total_pages - 1:
-                    if st.button("▶", key="next_featured"):
-                        st.session_state["featured_page"] += 1
-                        st.rerun()
-            
-            with col_movies:
-                # Afficher films alignés à gauche
-                cols = st.columns(6)
-                for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                    with cols[idx]:
-                        if movie['poster_url']:
-                            unique_id = f"featured_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                            poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                        st.caption(f"**{movie['title_x']}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10")
+        # Les 18 meilleurs films par note : 6 films par page, 3 pages maximum
+        render_carousel(load_top_movies(HOME_TOP_N), "featured", movies_per_page=6, n_columns=6)
 
     st.markdown("---")
     
     # Sélections par genre
-    genres_dict = {
-        "Action": "Action",
-        "Comédie": "Comedy", 
-        "Drame": "Drama",
-        "Horreur": "Horror",
-        "Romance": "Romance",
-        "Thriller": "Thriller",
-        "Aventure": "Adventure",
-        "Science-Fiction": "Sci-Fi"
-    }
+    genres_dict = HOME_GENRES
+    
+    top_lists_by_genre = load_genre_top_lists(genres_dict.values(), HOME_TOP_N)
     
     for genre_title, genre in genres_dict.items():
-        # Filtrer les films par genre
-        genre_movies = df_main[df_main['genres_x'].str.contains(genre, case=False, na=False)]
-        
-        if not genre_movies.empty:
-            # Sélectionner les 18 meilleurs films du genre
-            top_genre_movies = genre_movies.nlargest(18, 'averageRating')
-            
+        # Les 18 meilleurs films du genre (positions précalculées)
+        if len(top_lists_by_genre[genre]):
             st.subheader(genre_title)
             
-            # Système de pagination : 6 films par page, 3 pages maximum
-            movies_per_page = 6
-            total_pages = 3
-            
-            # État de pagination pour cette section
-            genre_key = f"{genre}_page"
-            if genre_key not in st.session_state:
-                st.session_state[genre_key] = 0
-            
-            current_page = st.session_state[genre_key]
-            
-            # Navigation avec boutons alignés dynamiquement
-            start_idx = current_page * movies_per_page
-            end_idx = min(start_idx + movies_per_page, len(top_genre_movies))
-            page_movies = top_genre_movies.iloc[start_idx:end_idx]
-            
-            if current_page > 0:
-                # Mode normal avec boutons des deux côtés
-                col_nav1, col_movies, col_nav2 = st.columns([1, 10, 1])
-                
-                with col_nav1:
-                    # Espacement vertical de 60px
-                    st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                    if st.button("◀", key=f"prev_{genre}"):
-                        st.session_state[genre_key] -= 1
-                        st.rerun()
-                
-                with col_nav2:
-                    # Espacement vertical de 60px
-                    st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                    if current_page < total_pages - 1 and len(top_genre_movies) > (current_page + 1) * movies_per_page:
-                        if st.button("▶", key=f"next_{genre}"):
-                            st.session_state[genre_key] += 1
-                            st.rerun()
-                
-                with col_movies:
-                    # Afficher films avec colonnes centrées (réduit pour performances)
-                    cols = st.columns(4)
-                    for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                        if idx >= 4:  # Limite stricte à 4 films
-                            break
-                        with cols[idx]:
-                            if 'poster_url' in movie and pd.notna(movie['poster_url']):
-                                unique_id = f"{genre}_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                                poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                                st.markdown(poster_html, unsafe_allow_html=True)
-                            else:
-                                st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                            st.caption(f"**{movie['title_x']}**")
-                            st.caption(f"⭐ {movie['averageRating']:.1f}/10")
-            else:
-                # Mode première page - alignement à gauche
-                col_movies, col_nav2 = st.columns([10, 1])
-                
-                with col_nav2:
-                    # Espacement vertical de 60px
-                    st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                    if current_page < total_pages - 1 and len(top_genre_movies) > (current_page + 1) * movies_per_page:
-                        if st.button("▶", key=f"next_{genre}"):
-                            st.session_state[genre_key] += 1
-                            st.rerun()
-                
-                with col_movies:
-                    # Afficher films alignés à gauche (réduit pour performances)
-                    cols = st.columns(4)
-                    for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                        if idx >= 4:  # Limite stricte à 4 films
-                            break
-                        with cols[idx]:
-                            if 'poster_url' in movie and pd.notna(movie['poster_url']):
-                                unique_id = f"{genre}_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                                poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                                st.markdown(poster_html, unsafe_allow_html=True)
-                            else:
-                                st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                            st.caption(f"**{movie['title_x']}**")
-                            st.caption(f"⭐ {movie['averageRating']:.1f}/10")
+            # 6 films par page, 4 affichés (réduit pour performances), 3 pages maximum
+            render_carousel(top_lists_by_genre[genre], genre, movies_per_page=6, n_columns=4)
             
             st.markdown("---")
     
@@ -664,87 +551,12 @@ if page == "Accueil":
     st.subheader("Les plus populaires")
     
     if not df_main.empty:
-        # Sélectionner les 12 films les plus populaires par note (réduit pour performances)
-        popular_movies = df_main.nlargest(12, 'averageRating')
-        
-        # Système de pagination : 4 films par page, 3 pages maximum
-        movies_per_page = 4
-        total_pages = 3
-        
-        # État de pagination pour cette section
-        if "popular_page" not in st.session_state:
-            st.session_state["popular_page"] = 0
-        
-        current_page = st.session_state["popular_page"]
-        
-        # Navigation avec boutons alignés dynamiquement
-        start_idx = current_page * movies_per_page
-        end_idx = min(start_idx + movies_per_page, len(popular_movies))
-        page_movies = popular_movies.iloc[start_idx:end_idx]
-        
-        if current_page > 0:
-            # Mode normal avec boutons des deux côtés
-            col_nav1, col_movies, col_nav2 = st.columns([1, 10, 1])
-            
-            with col_nav1:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if st.button("◀", key="prev_popular"):
-                    st.session_state["popular_page"] -= 1
-                    st.rerun()
-            
-            with col_nav2:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if current_page < total_pages - 1 and len(popular_movies) > (current_page + 1) * movies_per_page:
-                    if st.button("▶", key="next_popular"):
-                        st.session_state["popular_page"] += 1
-                        st.rerun()
-            
-            with col_movies:
-                # Afficher films avec colonnes centrées (optimisé)
-                cols = st.columns(4)
-                for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                    if idx >= 4:
-                        break
-                    with cols[idx]:
-                        if 'poster_url' in movie and pd.notna(movie['poster_url']):
-                            unique_id = f"popular_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                            poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                        st.caption(f"**{movie['title_x']}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10")
-        else:
-            # Mode première page - alignement à gauche
-            col_movies, col_nav2 = st.columns([10, 1])
-            
-            with col_nav2:
-                # Espacement vertical de 60px
-                st.markdown('<div style="height: 60px;"></div>', unsafe_allow_html=True)
-                if current_page < total_pages - 1 and len(popular_movies) > (current_page + 1) * movies_per_page:
-                    if st.button("▶", key="next_popular"):
-                        st.session_state["popular_page"] += 1
-                        st.rerun()
-            
-            with col_movies:
-                # Afficher films alignés à gauche (optimisé)
-                cols = st.columns(4)
-                for idx, (_, movie) in enumerate(page_movies.iterrows()):
-                    if idx >= 4:
-                        break
-                    with cols[idx]:
-                        if 'poster_url' in movie and pd.notna(movie['poster_url']):
-                            unique_id = f"popular_{current_page}_{idx}_{hash(movie['poster_url']) % 10000}"
-                            poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                        st.caption(f"**{movie['title_x']}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10")
+        # Les 12 films les plus populaires par note : 4 films par page, 3 pages maximum
+        render_carousel(load_top_movies(POPULAR_TOP_N), "popular", movies_per_page=4, n_columns=4)
         
         st.markdown("---")
+    
+    record_timing("Accueil (rerun complet)", time.perf_counter() - run_started)
 
 # PAGE CATALOGUE
 elif page == "Catalogue":
@@ -753,24 +565,50 @@ elif page == "Catalogue":
     if df_main.empty:
         st.warning("Aucune donnée disponible.")
     else:
+        # Recherche plein texte dans les synopsis
+        synopsis_query = st.text_input(
+            "Rechercher dans les synopsis",
+            placeholder="Ex: braquage à Paris, voyage dans le temps..."
+        ).strip()
+        
+        # Facettes précalculées ; comptes selon la recherche et les filtres déjà choisis
+        version = load_catalog_bundle().version
+        facets = load_catalog_facets()
+        if st.session_state.get('catalog_genre', "Tous") not in ["Tous"] + facets.genres.values:
+            st.session_state['catalog_genre'] = "Tous"
+        if st.session_state.get('catalog_year', "Toutes") not in ["Toutes"] + facets.years.values:
+            st.session_state['catalog_year'] = "Toutes"
+        current_genre = st.session_state.get('catalog_genre', "Tous")
+        current_year = st.session_state.get('catalog_year', "Toutes")
+        genre_counts, year_counts = facets.counts(
+            None if current_genre == "Tous" else current_genre,
+            None if current_year == "Toutes" else current_year,
+            load_search_positions(version, synopsis_query) if synopsis_query else None,
+        )
+        
+        def facet_label(value, counts):
+            return value if value not in counts else f"{value} ({counts[value]:,})".replace(",", " ")
+        
         # Filtres
         col1, col2, col3 = st.columns(3)
         
         with col1:
             # Filtre par genre
-            all_genres = []
-            for genres_str in df_main['genres_x'].dropna():
-                if isinstance(genres_str, str):
-                    genres_list = [g.strip() for g in genres_str.split(',')]
-                    all_genres.extend(genres_list)
-            
-            unique_genres = sorted(list(set(all_genres)))
-            selected_genre = st.selectbox("Filtrer par genre", ["Tous"] + unique_genres)
+            selected_genre = st.selectbox(
+                "Filtrer par genre",
+                ["Tous"] + facets.genres.values,
+                format_func=lambda genre: facet_label(genre, genre_counts),
+                key="catalog_genre"
+            )
         
         with col2:
             # Filtre par année
-            years = sorted(df_main['year'].dropna().unique(), reverse=True)
-            selected_year = st.selectbox("Filtrer par année", ["Toutes"] + [str(int(y)) for y in years if y > 1900])
+            selected_year = st.selectbox(
+                "Filtrer par année",
+                ["Toutes"] + facets.years.values,
+                format_func=lambda year: facet_label(year, year_counts),
+                key="catalog_year"
+            )
         
         with col3:
             # Tri
@@ -782,45 +620,48 @@ elif page == "Catalogue":
                 "Titre (A-Z)": ("title_x", True),
                 "Titre (Z-A)": ("title_x", False)
             }
+            if synopsis_query:
+                sort_options = {"Pertinence": ("search_score", False), **sort_options}
             selected_sort = st.selectbox("Trier par", list(sort_options.keys()))
         
-        # Appliquer les filtres
-        filtered_df = df_main.copy()
-        
-        if selected_genre != "Tous":
-            filtered_df = filtered_df[filtered_df['genres_x'].str.contains(selected_genre, case=False, na=False)]
-        
-        if selected_year != "Toutes":
-            filtered_df = filtered_df[filtered_df['year'] == int(selected_year)]
-        
-        # Appliquer le tri
+        # Films filtrés et triés : positions calculées une fois par état des filtres
         sort_column, ascending = sort_options[selected_sort]
-        filtered_df = filtered_df.sort_values(sort_column, ascending=ascending)
-        
-        st.write(f"**{len(filtered_df)} films trouvés**")
+        positions = load_catalog_positions(
+            version,
+            synopsis_query,
+            None if selected_genre == "Tous" else selected_genre,
+            None if selected_year == "Toutes" else selected_year,
+            sort_column,
+            ascending,
+        )
         
-        # Affichage en grille
-        if not filtered_df.empty:
-            movies_per_row = 6
-            rows = len(filtered_df) // movies_per_row + (1 if len(filtered_df) % movies_per_row > 0 else 0)
+        st.write(f"**{len(positions)} films trouvés**")
+        
+        # Pagination : retour à la première page quand les filtres ou le tri changent
+        movies_per_page = st.selectbox("Films par page", CATALOG_PAGE_SIZES, key="catalog_page_size")
+        filters_state = (synopsis_query, selected_genre, selected_year, selected_sort, movies_per_page)
+        if st.session_state.get('catalog_filters') != filters_state:
+            st.session_state['catalog_filters'] = filters_state
+            st.session_state['catalog_page'] = 1
+        n_pages = page_count(len(positions), movies_per_page)
+        current_page = min(st.session_state['catalog_page'], n_pages)
+        st.session_state['catalog_page'] = current_page
+        
+        # Affichage en grille de la page courante uniquement
+        add_poster_styles()
+        page_positions = page_slice(positions, current_page, movies_per_page)
+        if len(page_positions):
+            # Toute la page en un seul élément HTML
+            render_movie_grid(page_positions, "catalogue", n_columns=6)
             
-            for row in range(rows):
-                cols = st.columns(movies_per_row)
-                start_idx = row * movies_per_row
-                end_idx = min(start_idx + movies_per_row, len(filtered_df))
-                
-                for col_idx, movie_idx in enumerate(range(start_idx, end_idx)):
-                    movie = filtered_df.iloc[movie_idx]
-                    with cols[col_idx]:
-                        if movie['poster_url']:
-                            unique_id = f"catalog_{row}_{col_idx}_{hash(movie['poster_url']) % 10000}"
-                            poster_html = create_poster_with_play_button(movie['poster_url'], movie['title_x'], unique_id)
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown('<div style="height: 270px; width: 180px; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
-                        
-                        st.caption(f"**{movie['title_x']}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10 • {movie['year']}")
+            # Navigation entre les pages
+            col_prev, col_info, col_next = st.columns([1, 10, 1])
+            with col_prev:
+                st.button("◀", key="catalog_prev", on_click=shift_catalog_page, args=(-1,), disabled=current_page <= 1)
+            with col_info:
+                st.caption(f"Page {current_page} / {n_pages}")
+            with col_next:
+                st.button("▶", key="catalog_next", on_click=shift_catalog_page, args=(1,), disabled=current_page >= n_pages)
 
 # PAGE RECOMMANDATION
 elif page == "Recommandation":
@@ -843,7 +684,8 @@ elif page == "Recommandation":
             # Saisie libre du titre de film
             selected_movie = st.text_input(
                 "Tapez le nom d'un film que vous avez aimé :",
-                placeholder="Ex: Kill Bill, Amélie, Léon..."
+                placeholder="Ex: Kill Bill, Amélie, Léon...",
+                key="reco_title"
             )
         
         with col2:
@@ -887,9 +729,7 @@ elif page == "Recommandation":
                         
                         ref_col1, ref_col2 = st.columns([1, 3])
                         with ref_col1:
-                            if pd.notna(selected_movie_data['poster_url']):
-                                st.image(selected_movie_data['poster_url'], width=150)
-                            else:
+                            if not show_poster(selected_movie_data['poster_path'], selected_movie_data['title_x'], 150):
                                 st.markdown('<div style="height: 200px; width: 150px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white;">🎬</div>', unsafe_allow_html=True)
                         
                         with ref_col2:
@@ -898,8 +738,9 @@ elif page == "Recommandation":
                             st.markdown(f"**Année :** {int(selected_movie_data['year'])}")
                             st.markdown(f"**Genres :** {selected_movie_data['genres_x']}")
                             st.markdown(f"**Durée :** {int(selected_movie_data['runtime'])} min")
-                            if 'description' in selected_movie_data and pd.notna(selected_movie_data['description']):
-                                st.markdown(f"**Synopsis :** {selected_movie_data['description'][:200]}...")
+                            synopsis = get_synopsis(selected_movie_data['movie_id'])
+                            if synopsis:
+                                st.markdown(f"**Synopsis :** {synopsis[:200]}...")
                         
                         # Afficher les recommandations
                         st.markdown("---")
@@ -913,9 +754,7 @@ elif page == "Recommandation":
                             with cols[j]:
                                 # Card style pour chaque recommandation
                                 with st.container():
-                                    if pd.notna(movie['poster_url']):
-                                        st.image(movie['poster_url'], width=200)
-                                    else:
+                                    if not show_poster(movie['poster_path'], movie['title_x'], 200):
                                         st.markdown('<div style="height: 270px; width: 180px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin: 0 auto;">🎬</div>', unsafe_allow_html=True)
                                     
                                     st.markdown(f"**{movie['title_x']}**")
@@ -923,9 +762,10 @@ elif page == "Recommandation":
                                     st.markdown(f"🎭 {movie['genres_x']}")
                                     st.markdown(f"⏱️ {int(movie['runtime'])} min")
                                     
-                                    if 'description' in movie and pd.notna(movie['description']):
+                                    synopsis = get_synopsis(movie['movie_id'])
+                                    if synopsis:
                                         with st.expander("📖 Synopsis"):
-                                            st.write(movie['description'])
+                                            st.write(synopsis)
                     else:
                         pass  # Ne pas afficher de message d'erreur
                 else:
@@ -999,7 +839,7 @@ elif page == "Votre cinéma":
         
         # Rotation des films selon le jour pour varier la programmation
         random.seed(selected_day_index)  # Seed fixe pour cohérence
-        available_movies = df_main.sample(min(8, len(df_main))).reset_index(drop=True)
+        available_positions = np.random.choice(len(df_main), size=min(8, len(df_main)), replace=False)
         
         st.markdown(f"### Films du {selected_day['day_name']} {selected_day['day_num']} {selected_day['month']}")
         
@@ -1011,45 +851,25 @@ elif page == "Votre cinéma":
             showtimes = base_times
         
         # Affichage en grille
+        add_poster_styles()
         movies_per_row = 4
-        for i in range(0, len(available_movies), movies_per_row):
-            movie_cols = st.columns(movies_per_row)
+        for i in range(0, len(available_positions), movies_per_row):
+            row_positions = available_positions[i:i + movies_per_row]
             
-            for j, col in enumerate(movie_cols):
-                if i + j < len(available_movies):
-                    movie = available_movies.iloc[i + j]
-                    
-                    with col:
-                        # Poster du film
-                        if movie['poster_url']:
-                            poster_html = create_poster_with_play_button(
-                                movie['poster_url'], 
-                                movie['title_x'], 
-                                f"cinema_{i+j}"
-                            )
-                            st.markdown(poster_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown(
-                                '<div style="height: 200px; width: 100%; background: #333; border-radius: 8px; display: flex; align-items: center; justify-content: center; color: white; margin-bottom: 10px;">🎬</div>', 
-                                unsafe_allow_html=True
-                            )
-                        
-                        # Informations du film
-                        st.markdown(f"**{movie['title_x'][:25]}{'...' if len(movie['title_x']) > 25 else ''}**")
-                        st.caption(f"⭐ {movie['averageRating']:.1f}/10 • {movie['runtime']}min")
-                        st.caption(f"{movie['genres_x'][:20]}{'...' if len(str(movie['genres_x'])) > 20 else ''}")
-                        
-                        # Horaires pour ce film (2-3 séances par film)
-                        movie_times = random.sample(showtimes, min(3, len(showtimes)))
-                        movie_times.sort()
-                        
-                        st.markdown("**Séances:**")
-                        times_text = " • ".join([f"**{time}**" for time in movie_times])
-                        st.markdown(times_text)
-                        
-                        # Bouton de réservation
-                        if st.button(f"Réserver", key=f"book_{selected_day_index}_{i+j}"):
-                            st.success(f"Réservation pour {movie['title_x']}")
+            # Horaires pour chaque film (2-3 séances par film)
+            sessions = []
+            for _ in row_positions:
+                movie_times = sorted(random.sample(showtimes, min(3, len(showtimes))))
+                sessions.append("<b>Séances:</b> " + " • ".join(f"<b>{time}</b>" for time in movie_times))
+            
+            # Affiches et informations de la rangée en un seul élément HTML
+            render_movie_grid(row_positions, "cinema", n_columns=movies_per_row, extra_details=[sessions])
+            
+            # Boutons de réservation sous chaque film de la rangée
+            for j, col in enumerate(st.columns(movies_per_row)[:len(row_positions)]):
+                with col:
+                    if st.button(f"Réserver", key=f"book_{selected_day_index}_{i+j}"):
+                        st.success(f"Réservation pour {catalog_view()['title_x'][row_positions[j]]}")
         
         st.markdown("---")
         
@@ -1088,52 +908,55 @@ elif page == "Admin KPI":
         import random
         import numpy as np
         from datetime import datetime, timedelta
+        import plotly.express as px  # Import différé : seule cette page affiche des graphiques
         
         # === KPI FILMS ===
         st.subheader("🎬 KPI Films & Catalogue")
         
+        kpis = load_catalog_kpis()
+        
         # Métriques principales films
         films_col1, films_col2, films_col3, films_col4, films_col5 = st.columns(5)
         
         with films_col1:
-            total_films = len(df_main)
+            total_films = kpis['total_films']
             st.metric("Films au catalogue", total_films, "12")
         
         with films_col2:
-            avg_rating = df_main['averageRating'].mean()
+            avg_rating = kpis['avg_rating']
             st.metric("Note moyenne", f"{avg_rating:.1f}/10", "0.2")
         
         with films_col3:
-            total_runtime = df_main['runtime'].sum()
+            total_runtime = kpis['total_runtime']
             total_hours = int(total_runtime / 60)
             st.metric("Heures de contenu", f"{total_hours:,}h", "156h")
         
         with films_col4:
-            high_rated = len(df_main[df_main['averageRating'] >= 7.5])
+            high_rated = kpis['high_rated']
             high_rated_pct = (high_rated / total_films) * 100
             st.metric("Films bien notés", f"{high_rated_pct:.0f}%", "3%")
         
         with films_col5:
-            recent_films = len(df_main[df_main['year'] >= 2020])
+            recent_films = kpis['recent_films']
             st.metric("Films récents (2020+)", recent_films, "8")
         
         # Métriques secondaires films
         films_sub_col1, films_sub_col2, films_sub_col3, films_sub_col4 = st.columns(4)
         
         with films_sub_col1:
-            unique_genres = len(df_main['genres_x'].str.split(',').explode().unique())
+            unique_genres = kpis['unique_genres']
             st.metric("Genres disponibles", unique_genres)
         
         with films_sub_col2:
-            avg_runtime = df_main['runtime'].mean()
+            avg_runtime = kpis['avg_runtime']
             st.metric("Durée moyenne", f"{avg_runtime:.0f}min")
         
         with films_sub_col3:
-            blockbusters = len(df_main[df_main['runtime'] >= 150])
+            blockbusters = kpis['blockbusters']
             st.metric("Films > 2h30", blockbusters)
         
         with films_sub_col4:
-            short_films = len(df_main[df_main['runtime'] <= 90])
+            short_films = kpis['short_films']
             st.metric("Films < 1h30", short_films)
         
         st.markdown("---")
@@ -1196,8 +1019,7 @@ elif page == "Admin KPI":
         
         with graph_col1:
             # Top genres par popularité (simulé avec données réelles)
-            genres_split = df_main['genres_x'].str.split(',').explode().str.strip()
-            top_genres = genres_split.value_counts().head(8)
+            top_genres = kpis['top_genres']
             
             fig_genres = px.bar(
                 x=top_genres.values,
@@ -1249,8 +1071,7 @@ elif page == "Admin KPI":
         
         with graph2_col2:
             # Répartition par décennie avec tendances
-            df_main['decade'] = (df_main['year'] // 10) * 10
-            decade_counts = df_main['decade'].value_counts().sort_index()
+            decade_counts = kpis['decade_counts']
             
             fig_decades = px.bar(
                 x=decade_counts.index,
@@ -1287,11 +1108,86 @@ elif page == "Admin KPI":
             st.metric("Coût par acquisition", "€8.40", "-€1.20")
             st.metric("LTV moyenne", "€47.50", "€3.20")
         
+        # Empreinte mémoire du catalogue (types compacts vs types d'origine)
+        st.markdown("---")
+        st.subheader("🧠 Mémoire du catalogue")
+        
+        memory_stats = load_catalog_bundle().stats.get('memory')
+        if memory_stats:
+            raw_mb = memory_stats['raw_bytes'] / 1024**2
+            compact_mb = memory_stats['compact_bytes'] / 1024**2
+            live_mb = df_main.memory_usage(deep=True).sum() / 1024**2
+            
+            synopsis = memory_stats.get('offloaded', {}).get('description')
+            
+            mem_col1, mem_col2, mem_col3, mem_col4, mem_col5 = st.columns(5)
+            with mem_col1:
+                st.metric("Types d'origine", f"{raw_mb:.1f} Mo")
+            with mem_col2:
+                st.metric("Types compacts", f"{compact_mb:.1f} Mo")
+            with mem_col3:
+                st.metric("Gain des types", f"×{raw_mb / compact_mb:.1f}" if compact_mb else "-")
+            with mem_col4:
+                if synopsis:
+                    st.metric("Synopsis hors catalogue", f"{synopsis['raw_bytes'] / 1024**2:.1f} Mo",
+                              f"{synopsis['stored_bytes'] / 1024**2:.1f} Mo mappés", delta_color="off")
+                else:
+                    st.metric("Synopsis hors catalogue", "-")
+            with mem_col5:
+                st.metric("Catalogue chargé", f"{live_mb:.1f} Mo")
+            
+            memory_columns = pd.DataFrame([
+                {
+                    'Colonne': col,
+                    "Origine (Ko)": round(sizes['raw_bytes'] / 1024, 1),
+                    'Compact (Ko)': round(sizes['compact_bytes'] / 1024, 1),
+                }
+                for col, sizes in memory_stats['columns'].items()
+            ])
+            st.dataframe(memory_columns, use_container_width=True, hide_index=True)
+        
+        if warm_up.is_ready:
+            steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in warm_up.timings.items())
+            outcome = "terminé avec erreurs" if warm_up.errors else "terminé"
+            st.caption(f"Préchauffage {outcome} : {steps}")
+            for name, error in warm_up.errors.items():
+                st.caption(f"⚠️ Préchauffage {name} : {error}")
+        else:
+            st.caption("Préchauffage en cours…")
+        
+        card_cache = load_card_cache()
+        if card_cache.hits + card_cache.misses:
+            st.caption(
+                f"Cache des cartes : {len(card_cache)} cartes, "
+                f"{card_cache.hits / (card_cache.hits + card_cache.misses):.0%} servies depuis le cache"
+            )
+        
+        poster_cache = load_poster_cache()
+        st.caption(
+            f"Vignettes d'affiches : {len(poster_cache)} en cache ({poster_cache.size / 1024**2:.1f} Mo), "
+            f"{poster_cache.fetched} téléchargées, {poster_cache.errors} échecs"
+        )
+        
+        # Temps de rendu côté serveur : page d'accueil complète contre un seul carrousel (fragment)
+        timings = {kind: list(values) for kind, values in render_timings().items() if values}
+        if timings:
+            st.markdown("---")
+            st.subheader("⏱️ Temps de rendu")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Rendu': kind,
+                    'Mesures': len(values),
+                    'Médiane (ms)': round(float(np.median(values)) * 1000, 1),
+                    'p95 (ms)': round(float(np.percentile(values, 95)) * 1000, 1),
+                }
+                for kind, values in sorted(timings.items())
+            ]), use_container_width=True, hide_index=True)
+        
         # Top films performants
         st.markdown("---")
         st.subheader("🏆 Top Films Performance")
         
-        top_films = df_main.nlargest(10, 'averageRating')[['title_x', 'averageRating', 'year', 'genres_x', 'runtime']]
+        top_films = kpis['top_films'].copy()
         top_films.columns = ['Titre', 'Note', 'Année', 'Genre', 'Durée (min)']
         st.dataframe(top_films, use_container_width=True, hide_index=True)
 
@@ -1311,7 +1207,7 @@ elif page == "⚙️ Admin":
             st.info(f"**Taille mémoire:** {df_main.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
         
         with col2:
-            st.info(f"**Films avec posters:** {df_main['poster_url'].notna().sum()}")
+            st.info(f"**Films avec posters:** {df_main['poster_path'].notna().sum()}")
             st.info(f"**Année la plus ancienne:** {int(df_main['year'].min())}")
             st.info(f"**Année la plus récente:** {int(df_main['year'].max())}")
     
@@ -1321,7 +1217,7 @@ elif page == "⚙️ Admin":
     st.subheader("🔧 Actions")
     
     if st.button("🔄 Recharger les données"):
-        st.cache_data.clear()
+        clear_catalog_caches()
         st.rerun()
     
     if st.button("📥 Exporter les données"):
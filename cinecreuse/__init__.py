@@ -0,0 +1,11 @@
+"""Cœur applicatif de CinéCreuse+ (sans dépendance à Streamlit)
+
+Modules principaux, importables depuis des traitements batch ou des benchmarks :
+
+    catalog   nettoyage et typage du catalogue source
+    bundle    lecture et publication des bundles d'artefacts versionnés
+    search    index BM25 des synopsis
+    recsys    recherche par titre et recommandations
+    kpi       indicateurs agrégés du catalogue
+    cards     HTML des cartes de films et cache des cartes rendues
+"""
@@ -0,0 +1,366 @@
+"""API JSON locale (recommandations, recherche, catalogue) sur un serveur HTTP asyncio
+
+Usage :
+    python -m cinecreuse.api [--host 127.0.0.1] [--port 8600] [--workers N] [--out artifacts/catalog]
+
+Routes (GET, réponses JSON) :
+
+    /health                              version publiée et nombre de films
+    /movies?page=1&per_page=24&genre=Drama&sort=averageRating
+                                         page du catalogue, filtrée par genre et triée
+    /movies/<movie_id>                   fiche d'un film avec son synopsis
+    /search?q=...&field=title|synopsis&limit=20
+                                         recherche par titre ou plein texte (BM25) dans les synopsis
+    /recommend?movie_id=...&n=6          recommandations pour un film
+
+POST /recommend avec {"movie_ids": [...], "n": 6} traite plusieurs films en une requête.
+
+La boucle asyncio ne fait que lire et écrire le HTTP. Le calcul tourne dans un pool de processus :
+chaque worker attache le bundle publié (mmap, pages partagées entre workers) et le rouvre quand
+CURRENT change. Les requêtes de recommandation et de recherche arrivées à quelques millisecondes
+d'intervalle sont regroupées en un seul appel au pool (micro-batching).
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from cinecreuse.browse import filter_positions, page_slice, sort_positions
+from cinecreuse.bundle import DEFAULT_BUNDLE_ROOT, CatalogBundle, current_version
+from cinecreuse.catalog import poster_url
+from cinecreuse.recsys import recommend_movie, search_titles
+
+# Regroupement des requêtes : taille maximale d'un lot et attente maximale avant envoi au pool
+MAX_BATCH_SIZE = 64
+MAX_BATCH_DELAY = 0.002
+
+# Tris autorisés pour les pages du catalogue (colonne -> ordre croissant)
+SORT_COLUMNS = {'averageRating': False, 'numVotes': False, 'year': False, 'title_x': True}
+
+# Taille maximale d'une page du catalogue et d'une liste de résultats
+MAX_PAGE_SIZE = 100
+
+# Intervalle minimal entre deux vérifications de CURRENT dans un worker (secondes)
+VERSION_CHECK_INTERVAL = 1.0
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    """Erreur renvoyée au client avec un code HTTP"""
+
+    def __init__(self, status, message):
+        super().__init__(status, message)  # Les deux arguments pour rester picklable depuis les workers
+        self.status = status
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+# --- Côté worker (processus du pool) ---
+
+_worker = {}
+
+
+def _init_worker(root):
+    _worker['root'] = root
+    _worker['checked_at'] = 0.0
+    _worker['bundle'] = None
+
+
+def _state():
+    """Bundle, catalogue et index du worker, rouverts si une nouvelle version a été publiée"""
+    now = time.monotonic()
+    if _worker['bundle'] is None or now - _worker['checked_at'] > VERSION_CHECK_INTERVAL:
+        _worker['checked_at'] = now
+        version = current_version(_worker['root'])
+        if _worker['bundle'] is None or _worker['bundle'].version != version:
+            bundle = CatalogBundle.open_current(_worker['root']).attach()
+            _worker.update(bundle=bundle, frame=bundle.frame(), orders={}, synopsis_index=None)
+    return _worker
+
+
+def _records(rows):
+    """Lignes du catalogue (DataFrame) sous forme de dictionnaires sérialisables en JSON"""
+    records = json.loads(rows.to_json(orient='records', date_format='iso', double_precision=6))
+    for record in records:
+        record['poster_url'] = poster_url(record.get('poster_path'))
+    return records
+
+
+def _health():
+    state = _state()
+    return {'version': state['bundle'].version, 'n_movies': len(state['frame'])}
+
+
+def _movie(movie_id):
+    state = _state()
+    position = state['bundle'].position_of(movie_id)
+    if position is None:
+        raise ApiError(404, f"Film inconnu : {movie_id}")
+    record = _records(state['frame'].iloc[[position]])[0]
+    record['synopsis'] = state['bundle'].synopses[position]
+    return record
+
+
+def _catalog_page(page, per_page, genre, sort):
+    state = _state()
+    bundle, frame = state['bundle'], state['frame']
+    key = (genre, sort)
+    if key not in state['orders']:
+        if genre and genre not in bundle.genres:
+            raise ApiError(400, f"Genre inconnu : {genre}")
+        positions = filter_positions(bundle, frame, genre=genre or None)
+        if sort:
+            positions = sort_positions(frame, positions, sort, ascending=SORT_COLUMNS[sort])
+        state['orders'][key] = positions
+    positions = state['orders'][key]
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': len(positions),
+        'movies': _records(frame.iloc[page_slice(positions, page, per_page)]),
+    }
+
+
+def _search_batch(queries):
+    """Lot de recherches (requête, champ, limite) -> liste de résultats"""
+    state = _state()
+    results = []
+    for query, field, limit in queries:
+        if field == 'synopsis':
+            if state['synopsis_index'] is None:
+                state['synopsis_index'] = state['bundle'].synopsis_index()
+            positions, scores = state['synopsis_index'].search(query, top_k=limit)
+            records = _records(state['frame'].iloc[positions])
+            for record, score in zip(records, scores):
+                record['score'] = round(float(score), 4)
+        else:
+            records = _records(state['frame'].iloc[search_titles(state['frame'], query, state['bundle'], limit)])
+        results.append({'query': query, 'field': field, 'results': records})
+    return results
+
+
+def _recommend_batch(requests):
+    """Lot de recommandations (movie_id, n) -> liste de résultats (None si le film est inconnu)"""
+    state = _state()
+    bundle, frame = state['bundle'], state['frame']
+    max_n = bundle.neighbors.shape[1] if bundle.neighbors is not None else MAX_PAGE_SIZE
+    results = []
+    for movie_id, n in requests:
+        position = bundle.position_of(movie_id)
+        if position is None:
+            results.append(None)
+            continue
+        recommendations = recommend_movie(frame.iloc[position], frame, bundle, n_recommendations=min(n, max_n))
+        results.append({
+            'movie_id': movie_id,
+            'recommendations': _records(pd.DataFrame.from_records(recommendations, columns=frame.columns)),
+        })
+    return results
+
+
+# --- Côté serveur (boucle asyncio) ---
+
+class MicroBatcher:
+    """Regroupe les appels concurrents en lots traités par une seule tâche du pool"""
+
+    def __init__(self, pool, func, max_size=MAX_BATCH_SIZE, max_delay=MAX_BATCH_DELAY):
+        self.pool = pool
+        self.func = func
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.pending = []
+        self.flush_handle = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if batch:
+            self.batches += 1
+            self.items += len(batch)
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, self.func, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _int_param(params, name, default, minimum=1, maximum=None):
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"Paramètre {name} invalide")
+    value = max(value, minimum)
+    return min(value, maximum) if maximum is not None else value
+
+
+class CatalogApi:
+    """Routage des requêtes HTTP vers le pool de workers"""
+
+    def __init__(self, root=DEFAULT_BUNDLE_ROOT, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(root,))
+        self.search_batcher = MicroBatcher(self.pool, _search_batch)
+        self.recommend_batcher = MicroBatcher(self.pool, _recommend_batch)
+
+    async def call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def handle(self, method, target, body):
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        path = url.path.rstrip('/') or '/'
+
+        if path == '/recommend' and method == 'POST':
+            try:
+                payload = json.loads(body or b'{}')
+                movie_ids = [int(movie_id) for movie_id in payload['movie_ids']]
+                n = max(1, int(payload.get('n', 6)))
+            except (ValueError, KeyError, TypeError):
+                raise ApiError(400, "Corps attendu : {\"movie_ids\": [...], \"n\": 6}")
+            results = await asyncio.gather(*(self.recommend_batcher.submit((movie_id, n)) for movie_id in movie_ids))
+            return {'results': results}
+
+        if method != 'GET':
+            raise ApiError(405, f"Méthode non autorisée : {method}")
+
+        if path == '/health':
+            health = await self.call(_health)
+            health['batching'] = {
+                name: {'batches': batcher.batches, 'requests': batcher.items}
+                for name, batcher in (('search', self.search_batcher), ('recommend', self.recommend_batcher))
+            }
+            return health
+        if path == '/movies':
+            sort = params.get('sort', [None])[0]
+            if sort is not None and sort not in SORT_COLUMNS:
+                raise ApiError(400, f"Tri inconnu : {sort}")
+            return await self.call(
+                _catalog_page,
+                _int_param(params, 'page', 1),
+                _int_param(params, 'per_page', 24, maximum=MAX_PAGE_SIZE),
+                params.get('genre', [None])[0],
+                sort,
+            )
+        if path.startswith('/movies/'):
+            try:
+                movie_id = int(path[len('/movies/'):])
+            except ValueError:
+                raise ApiError(400, "Identifiant de film invalide")
+            return await self.call(_movie, movie_id)
+        if path == '/search':
+            query = params.get('q', [''])[0]
+            field = params.get('field', ['title'])[0]
+            if field not in ('title', 'synopsis'):
+                raise ApiError(400, f"Champ de recherche inconnu : {field}")
+            limit = _int_param(params, 'limit', 20, maximum=MAX_PAGE_SIZE)
+            return await self.search_batcher.submit((query, field, limit))
+        if path == '/recommend':
+            try:
+                movie_id = int(params['movie_id'][0])
+            except (KeyError, ValueError):
+                raise ApiError(400, "Paramètre movie_id manquant ou invalide")
+            result = await self.recommend_batcher.submit((movie_id, _int_param(params, 'n', 6)))
+            if result is None:
+                raise ApiError(404, f"Film inconnu : {movie_id}")
+            return result
+        raise ApiError(404, f"Route inconnue : {path}")
+
+    async def serve_connection(self, reader, writer):
+        """Traite les requêtes d'une connexion (HTTP/1.1 keep-alive) jusqu'à sa fermeture"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0) or 0))
+
+                try:
+                    status, payload = 200, await self.handle(method, target, body)
+                except ApiError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': repr(e)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        # Ouvre le bundle dans chaque worker avant d'accepter des connexions
+        await asyncio.gather(*(self.call(_health) for _ in range(self.workers)))
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        print(f"API CinéCreuse+ sur http://{host}:{port} ({self.workers} workers)")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON de recommandation et de recherche CinéCreuse+")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute")
+    parser.add_argument('--port', type=int, default=8600, help="Port d'écoute")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Processus de calcul")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Racine des bundles versionnés")
+    args = parser.parse_args(argv)
+
+    api = CatalogApi(args.out, args.workers)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Parcours paginé du catalogue : filtres par genre et par année, tri, découpage en pages
+
+Le résultat d'un état de filtres et de tri est un tableau de positions (int32) dans le catalogue.
+Le nombre de films trouvés est sa longueur. Une page est une tranche de ce tableau. Le coût d'affichage
+d'une page ne dépend donc pas de la taille du catalogue.
+"""
+import numpy as np
+import pandas as pd
+
+# Tailles de page proposées dans le Catalogue
+CATALOG_PAGE_SIZES = (24, 48, 96)
+
+
+def filter_positions(bundle, frame, genre=None, year=None, positions=None):
+    """Positions des films du genre et de l'année demandés, parmi `positions` (tout le catalogue par défaut)"""
+    if positions is None:
+        positions = np.arange(len(frame), dtype=np.int32)
+    positions = np.asarray(positions, dtype=np.int32)
+    if genre is not None:
+        if genre not in bundle.genres:
+            return positions[:0]
+        # Colonne du genre dans la matrice films x genres du bundle
+        positions = positions[bundle.genre_matrix[positions, bundle.genres.index(genre)].astype(bool)]
+    if year is not None:
+        positions = positions[frame['year'].to_numpy()[positions] == year]
+    return positions
+
+
+def sort_positions(frame, positions, column, ascending=True):
+    """Trie des positions selon une colonne (tri stable, valeurs absentes en dernier)"""
+    values = pd.Series(frame[column].to_numpy()[positions])
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+
+def page_count(total, per_page):
+    """Nombre de pages pour `total` films (au moins une)"""
+    return max(1, -(-total // per_page))
+
+
+def page_slice(positions, page, per_page):
+    """Positions des films de la page `page` (numérotée à partir de 1)"""
+    start = (page - 1) * per_page
+    return positions[start:start + per_page]
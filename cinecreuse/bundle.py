@@ -0,0 +1,332 @@
+"""Bundle d'artefacts versionné prêt à servir (colonnes, genres, index de titres, features)
+
+Arborescence d'un bundle :
+
+    <racine>/CURRENT                    nom de la version publiée
+    <racine>/<version>/manifest.json    métadonnées (source, colonnes, genres, features)
+    <racine>/<version>/catalog.arrow    colonnes du catalogue hors synopsis (Arrow IPC non compressé)
+    <racine>/<version>/synopsis_blob.npy    synopsis UTF-8 concaténés (+ synopsis_offsets.npy)
+    <racine>/<version>/id_keys.npy      movie_id triés (+ id_positions.npy)
+    <racine>/<version>/genres.npy       matrice films x genres (uint8)
+    <racine>/<version>/title_keys.npy   titres en minuscules triés
+    <racine>/<version>/title_positions.npy
+    <racine>/<version>/features.npy     matrice de features (float32)
+    <racine>/<version>/feature_scale.npy moyennes et écarts-types des features
+    <racine>/<version>/neighbors.npy    k plus proches voisins de chaque film (+ neighbor_distances.npy)
+    <racine>/<version>/bm25_*.npy       index BM25 des synopsis
+    <racine>/<version>/top_rated.npy    films les mieux notés (+ top_rated_by_genre.npy, genres x N)
+    <racine>/<version>/stats.json       rapport d'ingestion
+    <racine>/.deltas/<version>.csv      lignes brutes d'un delta, rejouées à chaque reconstruction
+
+Tous les tableaux sont relus en mémoire partagée (mmap), sans recalcul côté web. Les pages des
+fichiers mappés vivent dans le cache du système : tous les workers d'une même machine partagent
+donc une seule copie physique du catalogue et des features. Une poignée attachée (attach()) garde
+sa version mappée jusqu'à sa libération, même si CURRENT change ou si la version est supprimée ;
+lors d'un rafraîchissement, seules les pages réellement lues de la nouvelle version sont chargées.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cinecreuse.search import BM25Index
+
+# Racine par défaut des bundles
+DEFAULT_BUNDLE_ROOT = 'artifacts/catalog'
+
+# Version du format des bundles
+BUNDLE_FORMAT = 5
+
+# Répertoire des lignes brutes des deltas (ignoré par prune_versions)
+DELTA_DIR = '.deltas'
+
+_BM25_ARRAYS = ('terms', 'offsets', 'postings', 'freqs', 'doc_lengths')
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+
+
+def title_index(titles):
+    """Index des titres : (titres en minuscules triés, positions correspondantes)"""
+    keys = pd.Series(titles).str.lower().to_numpy(dtype=str)
+    positions = np.argsort(keys, kind='stable').astype(np.int32)
+    return keys[positions], positions
+
+
+def id_index(movie_ids):
+    """Index des identifiants : (movie_id triés, positions correspondantes)"""
+    movie_ids = np.asarray(movie_ids, dtype=np.int64)
+    positions = np.argsort(movie_ids, kind='stable').astype(np.int32)
+    return movie_ids[positions], positions
+
+
+def encode_strings(values):
+    """Concatène des chaînes en un blob UTF-8 : (blob uint8, offsets int64 de taille n + 1)"""
+    encoded = [value.encode('utf-8') if isinstance(value, str) else b'' for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+class StringColumn:
+    """Colonne de chaînes stockée en blob + offsets, décodée à la demande"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+    def tolist(self):
+        return [self[i] for i in range(len(self))]
+
+
+def delta_rows_path(root, name):
+    """Chemin des lignes brutes enregistrées d'un delta"""
+    return Path(root) / DELTA_DIR / name
+
+
+def bm25_arrays(synopsis_index):
+    """Tableaux de l'index BM25 à enregistrer dans le bundle"""
+    return {f'bm25_{name}': getattr(synopsis_index, name) for name in _BM25_ARRAYS}
+
+
+def new_version(created_at, source_hash):
+    """Nom unique d'une nouvelle version : horodatage à la microseconde, hash de la source, suffixe aléatoire
+
+    Deux publications rapprochées (ingestion, deltas successifs) ne partagent jamais de nom : les caches
+    indexés par version (catalogue attaché, cartes rendues, API) voient chaque publication.
+    """
+    return f"{created_at:%Y%m%dT%H%M%S%f}-{source_hash[:8]}-{uuid.uuid4().hex[:8]}"
+
+
+def write_bundle(root, version, df, arrays, manifest_extra=None, stats=None):
+    """Écrit un bundle complet dans <root>/<version> puis le publie dans CURRENT
+
+    `arrays` associe à chaque nom de fichier (sans .npy) le tableau à enregistrer. Une version déjà
+    présente n'est jamais remplacée (elle peut être attachée par un worker) : FileExistsError.
+    """
+    from pyarrow import feather
+
+    root = Path(root)
+    final_dir = root / version
+    if final_dir.exists():
+        raise FileExistsError(f"La version {version} existe déjà dans {root}")
+    tmp_dir = root / f".{version}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    df = df.reset_index(drop=True)
+    feather.write_feather(df, tmp_dir / 'catalog.arrow', compression='uncompressed')
+    for name, array in arrays.items():
+        np.save(tmp_dir / f'{name}.npy', np.ascontiguousarray(array))
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': version,
+        'n_movies': len(df),
+        'columns': list(df.columns),
+        **(manifest_extra or {}),
+    }
+    _write_json(tmp_dir / 'manifest.json', manifest)
+    _write_json(tmp_dir / 'stats.json', stats or {})
+
+    os.rename(tmp_dir, final_dir)  # Échoue si une version du même nom est apparue entre-temps
+    publish_version(root, version)
+    return final_dir
+
+
+def publish_version(root, version):
+    """Remplace atomiquement le pointeur CURRENT"""
+    root = Path(root)
+    tmp_path = root / 'CURRENT.tmp'
+    tmp_path.write_text(version + '\n', encoding='utf-8')
+    os.replace(tmp_path, root / 'CURRENT')
+
+
+def current_version(root=DEFAULT_BUNDLE_ROOT):
+    """Version publiée, ou None si aucun bundle n'existe"""
+    try:
+        version = (Path(root) / 'CURRENT').read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    return version if (Path(root) / version / 'manifest.json').exists() else None
+
+
+def prune_versions(root, keep=3):
+    """Supprime les anciennes versions en gardant les `keep` plus récentes et la version publiée"""
+    root = Path(root)
+    current = current_version(root)
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    for path in versions[:-keep] if keep else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class CatalogBundle:
+    """Accès en lecture seule (mmap) à une version du bundle"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'manifest.json', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+        self.n_movies = self.manifest['n_movies']
+        self.genres = self.manifest['genres']
+        self.feature_columns = self.manifest['feature_columns']
+        self._mapped = None
+        self._table = None
+
+    @classmethod
+    def open_current(cls, root=DEFAULT_BUNDLE_ROOT):
+        """Ouvre la version publiée dans CURRENT"""
+        version = current_version(root)
+        if version is None:
+            raise FileNotFoundError(f"Aucun bundle publié dans {root}")
+        return cls(Path(root) / version)
+
+    def attach(self):
+        """Mappe dès maintenant tous les fichiers de la version (poignée de version)
+
+        Les mappings restent valides après un changement de CURRENT ou un prune_versions() :
+        la version est libérée quand la dernière référence à la poignée disparaît.
+        """
+        from pyarrow import feather
+
+        if self._mapped is None:
+            self._table = feather.read_table(self.path / 'catalog.arrow', memory_map=True)
+            self._mapped = self.arrays()
+        return self
+
+    def _array(self, name):
+        if self._mapped is not None:
+            return self._mapped[name]
+        return np.load(self.path / f'{name}.npy', mmap_mode='r')
+
+    def frame(self, columns=None):
+        """Colonnes du catalogue sous forme de DataFrame (lecture Arrow en mmap)
+
+        Les colonnes numériques sans valeur absente sont des vues directes sur le fichier mappé.
+        """
+        from pyarrow import feather
+
+        if self._table is not None:
+            table = self._table.select(columns) if columns is not None else self._table
+        else:
+            table = feather.read_table(self.path / 'catalog.arrow', columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    @cached_property
+    def genre_matrix(self):
+        return self._array('genres')
+
+    @cached_property
+    def features(self):
+        return self._array('features')
+
+    @cached_property
+    def feature_scale(self):
+        return self._array('feature_scale')
+
+    @cached_property
+    def neighbors(self):
+        """Table (films x k) des positions des plus proches voisins, ou None si absente"""
+        if self._mapped is not None:
+            return self._mapped.get('neighbors')
+        if not (self.path / 'neighbors.npy').exists():
+            return None
+        return self._array('neighbors')
+
+    @cached_property
+    def neighbor_distances(self):
+        return self._array('neighbor_distances')
+
+    @cached_property
+    def top_rated(self):
+        """Positions des films les mieux notés, par note décroissante"""
+        return self._array('top_rated')
+
+    @cached_property
+    def top_rated_by_genre(self):
+        return self._array('top_rated_by_genre')
+
+    def genre_top(self, genre, n):
+        """Positions des n films les mieux notés d'un genre (vide si le genre est inconnu)"""
+        if genre not in self.genres:
+            return np.empty(0, dtype=np.int32)
+        top = self.top_rated_by_genre[self.genres.index(genre), :n]
+        return top[top >= 0]
+
+    @cached_property
+    def title_keys(self):
+        return self._array('title_keys')
+
+    @cached_property
+    def title_positions(self):
+        return self._array('title_positions')
+
+    @cached_property
+    def synopses(self):
+        """Synopsis en mmap, décodés film par film"""
+        return StringColumn(self._array('synopsis_blob'), self._array('synopsis_offsets'))
+
+    @cached_property
+    def id_keys(self):
+        return self._array('id_keys')
+
+    @cached_property
+    def id_positions(self):
+        return self._array('id_positions')
+
+    @cached_property
+    def content_hash(self):
+        """Empreinte du contenu publié (source, règles de nettoyage, format, deltas appliqués)"""
+        content = {key: self.manifest.get(key) for key in ('format', 'source_hash', 'cleaning_version', 'deltas')}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def position_of(self, movie_id):
+        """Position d'un film dans le catalogue à partir de son movie_id (None si inconnu)"""
+        i = np.searchsorted(self.id_keys, movie_id)
+        if i < len(self.id_keys) and self.id_keys[i] == movie_id:
+            return int(self.id_positions[i])
+        return None
+
+    def synopsis(self, movie_id):
+        """Synopsis d'un film, lu à la demande dans le blob (None si inconnu)"""
+        position = self.position_of(movie_id)
+        return self.synopses[position] if position is not None else None
+
+    @cached_property
+    def stats(self):
+        with open(self.path / 'stats.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def find_title(self, title):
+        """Position du premier film dont le titre correspond exactement (insensible à la casse)"""
+        key = title.strip().lower()
+        i = np.searchsorted(self.title_keys, key, side='left')
+        if i < len(self.title_keys) and self.title_keys[i] == key:
+            return int(self.title_positions[i])
+        return None
+
+    def arrays(self):
+        """Tous les tableaux du bundle, par nom de fichier (en mmap)"""
+        return {path.stem: np.load(path, mmap_mode='r') for path in sorted(self.path.glob('*.npy'))}
+
+    def synopsis_index(self):
+        """Index BM25 des synopsis, tableaux en mmap"""
+        return BM25Index(*(self._array(f'bm25_{name}') for name in _BM25_ARRAYS))
@@ -0,0 +1,139 @@
+"""HTML des cartes de films (affiche, titre, détails) et cache mémoire des cartes rendues
+
+Une carte ne dépend que du film, de sa variante d'affichage, de la version du catalogue et de la
+présence de la vignette locale de son affiche : elle est mise en cache sous la clé
+(movie_id, variante, version, vignette locale) et partagée entre toutes les sessions.
+"""
+import html
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from cinecreuse.posters import CARD_DISPLAY_WIDTH, remote_image
+
+# Nombre maximal de cartes gardées en mémoire
+DEFAULT_CARD_CACHE_SIZE = 5000
+
+
+def poster_html(url, title, srcset=None, color=None):
+    """Affiche avec bouton play au survol (styles partagés de la page)
+
+    L'image est chargée à l'approche de l'écran (loading="lazy"), dans la taille adaptée à la densité
+    de l'écran (srcset) ; en attendant, le cadre garde ses proportions avec la couleur dominante.
+    """
+    style = f' style="background: {color};"' if color else ''
+    sources = f' srcset="{html.escape(srcset)}" sizes="{CARD_DISPLAY_WIDTH}"' if srcset else ''
+    return (
+        f'<div class="poster"{style}><img src="{html.escape(url)}"{sources} alt="{html.escape(title)}" '
+        'loading="lazy" decoding="async"><div class="play-button">▶</div></div>'
+    )
+
+
+def poster_img_html(url, title, width, srcset=None, color=None):
+    """Affiche seule de `width` pixels de large (sans bouton play), même chargement que poster_html()"""
+    background = f' background: {color};' if color else ''
+    sources = f' srcset="{html.escape(srcset)}" sizes="{width}px"' if srcset else ''
+    return (
+        f'<img src="{html.escape(url)}"{sources} alt="{html.escape(title)}" width="{width}" loading="lazy" '
+        f'decoding="async" style="aspect-ratio: 2 / 3; object-fit: cover; border-radius: 8px;{background}">'
+    )
+
+
+def _catalogue_card(movie):
+    """Carte du Catalogue : note et année"""
+    details = f"⭐ {movie['averageRating']:.1f}/10"
+    if pd.notna(movie['year']):
+        details += f" • {movie['year']:.0f}"
+    return movie['title_x'], [details], 'poster-placeholder'
+
+
+def _cinema_card(movie):
+    """Carte de la programmation : titre et genres tronqués, note et durée"""
+    title = movie['title_x']
+    genres = str(movie['genres_x'])
+    return (
+        f"{title[:25]}{'...' if len(title) > 25 else ''}",
+        [f"⭐ {movie['averageRating']:.1f}/10 • {movie['runtime']:.0f}min",
+         html.escape(f"{genres[:20]}{'...' if len(genres) > 20 else ''}")],
+        'poster-placeholder cinema',
+    )
+
+
+# Variantes d'affichage : film -> (titre, lignes de détail HTML, classe de l'emplacement sans affiche)
+CARD_VARIANTS = {
+    'catalogue': _catalogue_card,
+    'cinema': _cinema_card,
+}
+
+# Colonnes lues par chaque variante (seules ces colonnes sont converties par la vue colonnaire)
+CARD_FIELDS = {
+    'catalogue': ('title_x', 'poster_path', 'averageRating', 'year'),
+    'cinema': ('title_x', 'poster_path', 'averageRating', 'runtime', 'genres_x'),
+}
+
+
+def card_body_html(movie, variant, poster_image=remote_image):
+    """Contenu d'une carte (affiche ou emplacement vide, titre, détails) pour une ligne du catalogue
+
+    `poster_image` donne (src, srcset, couleur) à partir du chemin de l'affiche, ou None sans affiche.
+    """
+    title, details, placeholder = CARD_VARIANTS[variant](movie)
+    image = poster_image(movie['poster_path'])
+    if image is not None:
+        src, sources, color = image
+        body = poster_html(src, title, sources, color)
+    else:
+        body = f'<div class="{placeholder}">🎬</div>'
+    body += f'<div class="card-title">{html.escape(title)}</div>'
+    return body + ''.join(f'<div class="card-detail">{detail}</div>' for detail in details)
+
+
+class CardCache:
+    """Cache LRU borné du HTML des cartes, sûr entre threads (une session Streamlit par thread)"""
+
+    def __init__(self, max_entries=DEFAULT_CARD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cards)
+
+    def cards(self, view, positions, variant, version, posters=None):
+        """HTML du contenu des cartes des films aux positions données (vue colonnaire du catalogue)
+
+        Chaque carte n'est construite qu'au premier appel, à partir des seules colonnes de sa variante.
+        Avec un cache d'affiches (PosterCache), les cartes pointent vers les vignettes locales ;
+        une carte construite avant l'arrivée (ou après l'éviction) de sa vignette est reconstruite.
+        """
+        movie_ids = view['movie_id'][positions].tolist()
+        if posters is not None:
+            local = [posters.has(path) for path in view['poster_path'][positions].tolist()]
+            poster_image = posters.image
+        else:
+            local = [False] * len(movie_ids)
+            poster_image = remote_image
+        bodies = []
+        for position, movie_id, is_local in zip(positions, movie_ids, local):
+            key = (movie_id, variant, version, is_local)
+            with self._lock:
+                body = self._cards.get(key)
+                if body is not None:
+                    self._cards.move_to_end(key)
+                    self.hits += 1
+            if body is None:
+                body = card_body_html(view.record(position, CARD_FIELDS[variant]), variant, poster_image)
+                with self._lock:
+                    self.misses += 1
+                    self._cards[key] = body
+                    if len(self._cards) > self.max_entries:
+                        self._cards.popitem(last=False)
+            bodies.append(body)
+        return bodies
+
+    def clear(self):
+        with self._lock:
+            self._cards.clear()
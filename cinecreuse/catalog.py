@@ -0,0 +1,174 @@
+"""Chargement et nettoyage du catalogue de films"""
+import pandas as pd
+
+# Fichier source du catalogue
+DEFAULT_SOURCE = 'attached_assets/df_main_cleaned_1749777540074.csv'
+
+# Préfixe des URLs d'affiches TMDB
+POSTER_BASE_URL = 'https://image.tmdb.org/t/p/w500'
+
+# Colonnes conservées après nettoyage (si présentes dans la source)
+CATALOG_COLUMNS = [
+    'movie_id', 'title_x', 'original_language', 'release_date', 'year', 'genres_x',
+    'description', 'poster_path', 'poster_url', 'runtime', 'averageRating', 'numVotes'
+]
+
+# Colonnes du CSV source lues par l'ingestion (les autres sont ignorées dès la lecture)
+SOURCE_COLUMNS = frozenset(CATALOG_COLUMNS) | {'id', 'title', 'genres', 'overview'}
+
+# Types compacts du catalogue servi (colonnes présentes uniquement)
+COMPACT_DTYPES = {
+    'genres_x': 'category',
+    'original_language': 'category',
+    'year': 'float32',
+    'runtime': 'int32',
+    'averageRating': 'float32',
+    'numVotes': 'int32',
+}
+
+# À incrémenter à chaque modification des règles de nettoyage (invalide les bundles publiés)
+CLEANING_VERSION = 4
+
+# Bits des identifiants hashés : les entiers au-delà de 2**53 sont arrondis en JavaScript (JSON, composants)
+MOVIE_ID_HASH_BITS = 53
+
+
+def assign_movie_ids(df):
+    """Identifiant stable par film : id TMDB si disponible, sinon hash de (titre, date de sortie) sur 53 bits"""
+    hashed = pd.util.hash_pandas_object(df[['title_x', 'release_date']], index=False)
+    movie_ids = (hashed.to_numpy() >> (64 - MOVIE_ID_HASH_BITS)).astype('int64')
+    if 'id' in df.columns:
+        source_ids = pd.to_numeric(df['id'], errors='coerce').to_numpy()
+        has_id = ~pd.isna(source_ids)
+        movie_ids[has_id] = source_ids[has_id].astype('int64')
+    return pd.Series(movie_ids, index=df.index)
+
+
+def add_count(stats, key, n):
+    """Cumule un compteur du rapport de nettoyage"""
+    stats[key] = stats.get(key, 0) + n
+
+
+def prepare_movies(df):
+    """Règles de nettoyage ligne à ligne : mapping des colonnes, dates, numériques, affiches, genres, identifiant"""
+    # 1. Mapper les colonnes vers les noms attendus par l'application
+    if 'title' in df.columns and 'title_x' not in df.columns:
+        df['title_x'] = df['title']
+    if 'genres' in df.columns and 'genres_x' not in df.columns:
+        df['genres_x'] = df['genres']
+    if 'overview' in df.columns and 'description' not in df.columns:
+        df['description'] = df['overview']
+
+    # Créer la colonne year à partir de release_date
+    if 'release_date' in df.columns and 'year' not in df.columns:
+        df['year'] = pd.to_datetime(df['release_date'], errors='coerce').dt.year
+        df['year'] = df['year'].fillna(2000).astype(int)  # Valeur par défaut si date manquante
+
+    # S'assurer que poster_url existe
+    if 'poster_path' in df.columns and 'poster_url' not in df.columns:
+        df['poster_url'] = POSTER_BASE_URL + df['poster_path'].astype(str)
+        df.loc[df['poster_path'].isna(), 'poster_url'] = None
+
+    # 2. Gestion des valeurs manquantes pour les colonnes critiques
+    df['title_x'] = df['title_x'].fillna('Titre non disponible')
+    df['genres_x'] = df['genres_x'].fillna('Inconnu')
+    if 'description' in df.columns:
+        df['description'] = df['description'].fillna('Aucune description disponible')
+    elif 'overview' in df.columns:
+        df['description'] = df['overview'].fillna('Aucune description disponible')
+
+    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce')
+    df['year'] = df['release_date'].dt.year
+
+    # 3. Nettoyer les colonnes numériques
+    numeric_columns = ['runtime', 'averageRating', 'numVotes']
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = df[col].fillna(0)
+
+    # 3. Créer l'URL du poster si elle n'existe pas
+    if 'poster_url' not in df.columns:
+        df['poster_url'] = df['poster_path'].apply(
+            lambda x: f"{POSTER_BASE_URL}{x}" if pd.notna(x) and str(x).startswith('/') else None
+        )
+
+    # 4. Nettoyer les genres (enlever les crochets et guillemets)
+    df['genres_x'] = df['genres_x'].astype(str)
+    df['genres_x'] = df['genres_x'].str.replace(r'[\[\]\'"]', '', regex=True)
+    df['genres_x'] = df['genres_x'].str.replace(r'\s+', ' ', regex=True)
+
+    df['movie_id'] = assign_movie_ids(df)
+    return df
+
+
+def filter_movies(df, stats):
+    """Écarte les films incomplets, sans durée ou sans note (compteurs cumulés dans `stats`)"""
+    rows = len(df)
+    df = df.dropna(subset=['title_x', 'genres_x', 'runtime', 'averageRating'])
+    add_count(stats, 'dropped_missing', rows - len(df))
+    rows = len(df)
+    df = df[df['runtime'] > 0]
+    add_count(stats, 'dropped_runtime', rows - len(df))
+    rows = len(df)
+    df = df[df['averageRating'] > 0]
+    add_count(stats, 'dropped_rating', rows - len(df))
+    return df
+
+
+def select_catalog_columns(df):
+    """Conserve uniquement les colonnes utiles disponibles"""
+    return df[[col for col in CATALOG_COLUMNS if col in df.columns]]
+
+
+def clean_movies(df, stats=None):
+    """Applique les règles de nettoyage au DataFrame brut et retourne le catalogue
+
+    Si `stats` est un dictionnaire, il est complété avec le nombre de lignes écartées par chaque règle.
+    """
+    if stats is None:
+        stats = {}
+    add_count(stats, 'rows_read', len(df))
+    df = prepare_movies(df)
+
+    # 5. Filtrer les données, puis dédoublonner les films retenus (même ordre que cinecreuse.stream)
+    df = filter_movies(df, stats)
+    rows = len(df)
+    df = df.drop_duplicates(subset=['title_x', 'release_date'], keep='first')
+    df = df.drop_duplicates(subset=['movie_id'], keep='first')
+    add_count(stats, 'dropped_duplicates', rows - len(df))
+    add_count(stats, 'rows_kept', len(df))
+
+    # 6. Conserver uniquement les colonnes utiles disponibles
+    return select_catalog_columns(df)
+
+
+def load_movies(source=DEFAULT_SOURCE, stats=None):
+    """Lit le CSV source et retourne le catalogue nettoyé"""
+    return clean_movies(pd.read_csv(source, usecols=lambda col: col in SOURCE_COLUMNS), stats)
+
+
+def split_genres(genres_str):
+    """Liste des genres d'une chaîne 'Drama, Crime' (sans valeurs vides)"""
+    if not isinstance(genres_str, str):
+        return []
+    return [g.strip() for g in genres_str.split(',') if g.strip() and g.strip() != 'nan']
+
+
+def compact_catalog(df):
+    """Version économe en mémoire du catalogue
+
+    Genres et langues deviennent catégoriels, les numériques passent en float32/int32,
+    et les affiches ne gardent que leur chemin (l'URL est reconstruite par poster_url()).
+    """
+    if 'poster_path' in df.columns:
+        df = df.drop(columns=['poster_url'], errors='ignore')
+    dtypes = {col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def poster_url(poster_path):
+    """URL complète d'une affiche à partir de son chemin TMDB (None si absent)"""
+    if isinstance(poster_path, str) and poster_path:
+        return POSTER_BASE_URL + poster_path
+    return None
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Mises à jour incrémentales du catalogue (ajout ou modification de films par identifiant)
+
+Usage :
+    python -m cinecreuse.delta NOUVEAUX_FILMS.csv [--out artifacts/catalog] [--keep 3]
+
+Les lignes du delta suivent le schéma du CSV source. Elles sont nettoyées avec les mêmes règles,
+puis appliquées à la version publiée : les films dont le movie_id existe déjà sont remplacés à leur
+position, les autres sont ajoutés en fin de catalogue. Colonnes, matrice de genres, features, index
+des titres et table des voisins sont patchés sans rien recalculer pour les films inchangés ; l'échelle
+des features reste celle de l'ingestion complète. Seuls l'index BM25 (dont les idf dépendent de tout
+le corpus), l'index trié des identifiants et les tops par note sont reconstruits. La nouvelle version est publiée
+atomiquement via CURRENT.
+
+Le CSV source n'est pas modifié : les lignes brutes du delta sont enregistrées dans <racine>/.deltas/
+et référencées par le manifeste, pour être rejouées par chaque reconstruction complète (cinecreuse.ingest).
+"""
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from cinecreuse.bundle import (
+    DEFAULT_BUNDLE_ROOT, CatalogBundle, bm25_arrays, delta_rows_path, encode_strings, id_index, new_version,
+    prune_versions, write_bundle,
+)
+from cinecreuse.catalog import clean_movies, compact_catalog, split_genres
+from cinecreuse.features import build_feature_matrix, encode_genres, nearest_neighbors, standardize
+from cinecreuse.ingest import _ingest_lock
+from cinecreuse.search import BM25Index
+from cinecreuse.toplists import build_top_lists
+
+
+def _categoricals_to_object(df):
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def _patch_title_index(keys, positions, titles, changed):
+    """Retire les entrées des films modifiés puis insère leurs nouveaux titres à leur place triée"""
+    keep = ~np.isin(positions, changed)
+    keys, positions = keys[keep], positions[keep]
+
+    new_keys = pd.Series(titles).str.lower().to_numpy(dtype=str)
+    order = np.lexsort((changed, new_keys))
+    new_keys, new_positions = new_keys[order], changed[order].astype(np.int32)
+
+    # À titre égal, l'ordre des positions est conservé (le premier film du catalogue reste trouvé en premier)
+    insert_at = np.searchsorted(keys, new_keys, side='left')
+    for i, (key, position) in enumerate(zip(new_keys, new_positions)):
+        j = insert_at[i]
+        while j < len(keys) and keys[j] == key and positions[j] < position:
+            j += 1
+        insert_at[i] = j
+
+    keys = keys.astype(np.result_type(keys.dtype, new_keys.dtype))
+    return np.insert(keys, insert_at, new_keys), np.insert(positions, insert_at, new_positions)
+
+
+def _patch_neighbors(neighbors, distances, scaled, changed):
+    """Met à jour la table des voisins après modification ou ajout des films `changed`"""
+    n_total, k = len(scaled), neighbors.shape[1]
+    n_old = len(neighbors)
+    updated = changed[changed < n_old]
+
+    # Films dont la liste contient un film modifié : leurs distances ne sont plus valides, recalcul complet
+    stale = np.flatnonzero(np.isin(neighbors, updated).any(axis=1))
+    recompute = np.union1d(changed, stale)
+
+    new_neighbors = np.empty((n_total, k), dtype=np.int32)
+    new_distances = np.empty((n_total, k), dtype=np.float32)
+    new_neighbors[:n_old], new_distances[:n_old] = neighbors, distances
+    if len(recompute):
+        new_neighbors[recompute], new_distances[recompute] = nearest_neighbors(
+            scaled[recompute], scaled, k, exclude=recompute
+        )
+
+    # Autres films : fusion de leur liste actuelle (toujours valide) avec les distances aux films changés
+    others = np.setdiff1d(np.arange(n_old), recompute)
+    if len(others) and len(changed):
+        a, b = scaled[others], scaled[changed]
+        sq = np.einsum('ij,ij->i', a, a)[:, None] + np.einsum('ij,ij->i', b, b)[None, :] - 2 * a @ b.T
+        changed_dist = np.sqrt(np.maximum(sq, 0)).astype(np.float32)
+        candidates = np.hstack([new_neighbors[others], np.broadcast_to(changed, changed_dist.shape)])
+        candidate_dist = np.hstack([new_distances[others], changed_dist])
+        order = np.argsort(candidate_dist, axis=1, kind='stable')[:, :k]
+        new_neighbors[others] = np.take_along_axis(candidates, order, axis=1)
+        new_distances[others] = np.take_along_axis(candidate_dist, order, axis=1)
+    return new_neighbors, new_distances
+
+
+def apply_delta(rows, root=DEFAULT_BUNDLE_ROOT, keep=3, source_name=None):
+    """Applique des films nouveaux ou modifiés (DataFrame au format du CSV source) et publie une nouvelle version
+
+    Lecture de la version publiée, patch et publication se font sous le verrou d'ingestion : deux deltas
+    (ou un delta et une reconstruction) simultanés s'appliquent l'un après l'autre, sans perte.
+    """
+    with _ingest_lock(root):
+        return _apply_delta(rows, root, keep, source_name)
+
+
+def _apply_delta(rows, root, keep, source_name):
+    bundle = CatalogBundle.open_current(root)
+    cleaning = {}
+    delta = compact_catalog(clean_movies(rows.copy(), cleaning)).reset_index(drop=True)
+
+    # Rapprochement par identifiant : mises à jour en place, nouveautés en fin de catalogue
+    # Copie modifiable : les colonnes numériques du bundle sont des vues en lecture seule sur le fichier mappé
+    base = _categoricals_to_object(bundle.frame().copy(deep=True))
+    n_old = len(base)
+    existing = pd.Index(base['movie_id']).get_indexer(delta['movie_id'])
+    is_update = existing >= 0
+    delta = _categoricals_to_object(delta.reindex(columns=list(base.columns) + ['description']))
+    updates, appends = delta[is_update], delta[~is_update]
+    changed = np.concatenate([existing[is_update], np.arange(n_old, n_old + len(appends))]).astype(np.int32)
+    changed_rows = pd.concat([updates, appends], ignore_index=True)
+
+    for col in base.columns:
+        base.loc[existing[is_update], col] = updates[col].to_numpy()
+    catalog = compact_catalog(pd.concat([base, appends[base.columns]], ignore_index=True))
+    n_total = len(catalog)
+
+    synopses = bundle.synopses.tolist() + [None] * len(appends)
+    for position, description in zip(changed, changed_rows['description']):
+        synopses[position] = description
+
+    # Genres : les genres inconnus sont ajoutés en fin de vocabulaire
+    genres = list(bundle.genres)
+    new_genres = sorted({g for s in changed_rows['genres_x'] for g in split_genres(s)} - set(genres))
+    genres += new_genres
+    genre_matrix = np.zeros((n_total, len(genres)), dtype=np.uint8)
+    genre_matrix[:n_old, :len(bundle.genres)] = bundle.genre_matrix
+    changed_genres = encode_genres(changed_rows['genres_x'], genres)
+    genre_matrix[changed] = changed_genres
+
+    # Features : colonnes de genres nouvelles à zéro pour les films existants
+    numeric_features = [col for col in bundle.feature_columns if not col.startswith('genre_')]
+    changed_features, feature_columns = build_feature_matrix(changed_rows, changed_genres, genres, numeric_features)
+    features = np.zeros((n_total, len(feature_columns)), dtype=np.float32)
+    features[:n_old, :bundle.features.shape[1]] = bundle.features
+    features[changed] = changed_features
+    scale = np.hstack([
+        bundle.feature_scale,
+        np.tile(np.array([[0.0], [1.0]], dtype=np.float32), len(new_genres)),
+    ])
+
+    arrays = {'genres': genre_matrix, 'features': features, 'feature_scale': scale}
+    arrays['top_rated'], arrays['top_rated_by_genre'] = build_top_lists(catalog['averageRating'], genre_matrix)
+    arrays['title_keys'], arrays['title_positions'] = _patch_title_index(
+        np.asarray(bundle.title_keys), np.asarray(bundle.title_positions), changed_rows['title_x'], changed
+    )
+    if bundle.neighbors is not None:
+        arrays['neighbors'], arrays['neighbor_distances'] = _patch_neighbors(
+            np.asarray(bundle.neighbors), np.asarray(bundle.neighbor_distances), standardize(features, scale), changed
+        )
+    arrays['id_keys'], arrays['id_positions'] = id_index(catalog['movie_id'])
+    arrays['synopsis_blob'], arrays['synopsis_offsets'] = encode_strings(synopses)
+    arrays.update(bm25_arrays(BM25Index.build(synopses)))
+
+    applied_at = datetime.now(timezone.utc)
+    version = new_version(applied_at, bundle.manifest['source_hash'])
+    rows_path = delta_rows_path(root, f'{version}.csv')
+    rows_path.parent.mkdir(parents=True, exist_ok=True)
+    rows.to_csv(rows_path, index=False)
+    delta_report = {
+        'applied_at': applied_at.isoformat(),
+        'source': source_name,
+        'rows': rows_path.name,
+        'base_version': bundle.version,
+        'cleaning': cleaning,
+        'updated': int(is_update.sum()),
+        'appended': int(len(appends)),
+        'new_genres': new_genres,
+    }
+    manifest_extra = {
+        key: value for key, value in bundle.manifest.items()
+        if key not in ('format', 'version', 'n_movies', 'columns')
+    }
+    manifest_extra.update({
+        'genres': genres,
+        'feature_columns': feature_columns,
+        'deltas': bundle.manifest.get('deltas', []) + [delta_report],
+    })
+    stats = {**bundle.stats, 'delta': delta_report}
+    stats.setdefault('catalog', {})['n_movies'] = n_total
+
+    path = write_bundle(root, version, catalog, arrays, manifest_extra=manifest_extra, stats=stats)
+    prune_versions(root, keep)
+    return path, delta_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajout ou mise à jour incrémentale de films du catalogue")
+    parser.add_argument('delta', help="CSV des films à ajouter ou mettre à jour (schéma du CSV source)")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Racine des bundles versionnés")
+    parser.add_argument('--keep', type=int, default=3, help="Nombre de versions conservées")
+    args = parser.parse_args(argv)
+
+    path, report = apply_delta(pd.read_csv(args.delta), args.out, args.keep, source_name=args.delta)
+    print(f"Bundle publié : {path}")
+    print(f"  Films mis à jour : {report['updated']}")
+    print(f"  Films ajoutés    : {report['appended']}")
+    if report['new_genres']:
+        print(f"  Nouveaux genres  : {', '.join(report['new_genres'])}")
+
+
+if __name__ == '__main__':
+    main()
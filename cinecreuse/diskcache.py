@@ -0,0 +1,106 @@
+"""Cache disque persistant des données dérivées du catalogue (survit aux redémarrages)
+
+Chaque entrée est un fichier pickle nommé d'après l'empreinte de ses entrées : contenu du bundle,
+paramètres et code source de la fonction de calcul. Un changement de données ou de code donne donc
+une nouvelle clé. Dès que la taille totale dépasse la limite, les entrées les moins récemment lues
+sont supprimées.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+from pathlib import Path
+
+# Répertoire du cache des données dérivées
+DEFAULT_CACHE_DIR = '.cache/derived'
+
+# Taille maximale du cache sur disque
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+
+def code_version(func):
+    """Empreinte du code source d'une fonction"""
+    return hashlib.sha256(inspect.getsource(func).encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """Cache clé -> valeur picklée sur disque, borné en taille (éviction LRU)"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, func, content_key, params):
+        """Empreinte d'un appel : fonction, version de son code, contenu des données et paramètres"""
+        parts = (func.__module__, func.__qualname__, code_version(func), content_key, sorted(params.items()))
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return self.directory / f'{key[:32]}.pkl'
+
+    def get_or_compute(self, func, content_key, *args, **params):
+        """Retourne func(*args, **params), relu sur disque s'il a déjà été calculé
+
+        Les données passées dans `args` sont représentées dans la clé par `content_key` (par exemple
+        l'empreinte du bundle) ; seuls les `params` nommés y figurent en clair.
+        """
+        path = self.path(self.key(func, content_key, params))
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception:
+            # Entrée absente, tronquée ou écrite par d'autres versions de pandas/NumPy : on recalcule
+            pass
+        else:
+            self.hits += 1
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass  # Supprimée entre-temps par l'éviction d'un autre processus
+            return value
+
+        self.misses += 1
+        value = func(*args, **params)
+        self.put(path, value)
+        return value
+
+    def put(self, path, value):
+        """Écrit une entrée de façon atomique puis applique la limite de taille"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def entries(self):
+        """Entrées du cache : (chemin, taille, date de dernier accès) de la plus ancienne à la plus récente"""
+        entries = []
+        for path in self.directory.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Supprime les entrées les moins récemment utilisées jusqu'à repasser sous max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,92 @@
+"""Facettes du Catalogue (genres, années) : vocabulaires et comptes par index bitmap
+
+Chaque valeur d'une facette a un bitmap des films qui la portent (un bit par film, tableaux packés
+de uint8). Les comptes de toutes les valeurs pour un ensemble de films filtrés s'obtiennent en une
+seule opération vectorisée : ET binaire avec le bitmap du filtre, puis comptage des bits.
+
+Les comptes d'une facette tiennent compte de tous les filtres actifs sauf le sien : la liste des
+genres indique combien de films chaque genre donnerait avec l'année et la recherche en cours.
+"""
+import numpy as np
+
+# Années plus anciennes écartées du filtre par année (dates absentes ou aberrantes)
+MIN_FACET_YEAR = 1900
+
+
+def to_bitmap(mask):
+    """Bitmap packé d'un masque booléen sur les films"""
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def positions_bitmap(positions, n_movies):
+    """Bitmap des films aux positions données"""
+    mask = np.zeros(n_movies, dtype=bool)
+    mask[positions] = True
+    return to_bitmap(mask)
+
+
+class FacetIndex:
+    """Valeurs d'une facette et bitmap des films de chaque valeur (une ligne par valeur)"""
+
+    def __init__(self, values, bitmaps):
+        self.values = list(values)
+        self.bitmaps = bitmaps
+        self._rows = {value: i for i, value in enumerate(self.values)}
+
+    @classmethod
+    def from_matrix(cls, values, matrix):
+        """Facette multi-valuée (ex. genres) à partir d'une matrice films x valeurs"""
+        return cls(values, np.packbits(np.asarray(matrix, dtype=bool).T, axis=1))
+
+    @classmethod
+    def from_column(cls, column, values):
+        """Facette à une valeur par film (ex. année) : bitmap de chaque valeur de `values`"""
+        column = np.asarray(column)
+        return cls(values, np.packbits(column[None, :] == np.asarray(values)[:, None], axis=1))
+
+    def bitmap(self, value):
+        return self.bitmaps[self._rows[value]]
+
+    def counts(self, bitmap=None):
+        """Nombre de films de chaque valeur, parmi ceux du bitmap (tous par défaut)"""
+        selected = self.bitmaps if bitmap is None else self.bitmaps & bitmap
+        return np.bitwise_count(selected).sum(axis=1, dtype=np.int64)
+
+
+class CatalogFacets:
+    """Facettes genre et année d'une version du catalogue"""
+
+    def __init__(self, genres, years, n_movies):
+        self.genres = genres
+        self.years = years
+        self.n_movies = n_movies
+
+    @classmethod
+    def build(cls, bundle, frame):
+        """Vocabulaires et bitmaps : genres du bundle, années connues de la plus récente à la plus ancienne"""
+        year_column = frame['year'].to_numpy()
+        years = np.unique(year_column[~np.isnan(year_column)]).astype(int)
+        years = sorted((int(year) for year in years if year > MIN_FACET_YEAR), reverse=True)
+        return cls(
+            FacetIndex.from_matrix(bundle.genres, bundle.genre_matrix),
+            FacetIndex.from_column(year_column, years),
+            len(frame),
+        )
+
+    def counts(self, genre=None, year=None, positions=None):
+        """Comptes par genre et par année ({valeur: nombre}) pour les filtres actifs
+
+        `positions` restreint aux films d'une recherche ; chaque facette ignore son propre filtre.
+        """
+        base = None if positions is None else positions_bitmap(positions, self.n_movies)
+        genre_filter, year_filter = base, base
+        if year is not None:
+            year_bits = self.years.bitmap(year)
+            genre_filter = year_bits if genre_filter is None else genre_filter & year_bits
+        if genre is not None:
+            genre_bits = self.genres.bitmap(genre)
+            year_filter = genre_bits if year_filter is None else year_filter & genre_bits
+        return (
+            dict(zip(self.genres.values, self.genres.counts(genre_filter).tolist())),
+            dict(zip(self.years.values, self.years.counts(year_filter).tolist())),
+        )
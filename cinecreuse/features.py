@@ -0,0 +1,86 @@
+"""Matrice de genres, features numériques et plus proches voisins pour les recommandations"""
+import numpy as np
+
+from cinecreuse.catalog import split_genres
+
+# Features numériques utilisées si elles sont présentes dans le catalogue
+NUMERIC_FEATURES = ['averageRating', 'runtime', 'year', 'numVotes', 'vote_average', 'vote_count', 'popularity']
+
+# Modèle KNN entraîné hors ligne
+DEFAULT_MODEL_PATH = 'attached_assets/knn_model_1749778773406.joblib'
+
+# Nombre de voisins précalculés par film
+DEFAULT_NEIGHBORS = 20
+
+# Nombre de requêtes traitées par bloc lors du calcul des distances
+NEIGHBOR_BLOCK_SIZE = 1024
+
+
+def encode_genres(genres_series, genres):
+    """Encodage one-hot des genres selon le vocabulaire `genres` (genres inconnus ignorés)"""
+    genre_ids = {genre: i for i, genre in enumerate(genres)}
+    matrix = np.zeros((len(genres_series), len(genres)), dtype=np.uint8)
+    for row, genres_str in enumerate(genres_series):
+        for genre in split_genres(genres_str):
+            if genre in genre_ids:
+                matrix[row, genre_ids[genre]] = 1
+    return matrix
+
+
+def build_genre_matrix(genres_series):
+    """Encodage one-hot des genres : (matrice films x genres en uint8, liste triée des genres)"""
+    genres = sorted({g for genres_str in genres_series for g in split_genres(genres_str)})
+    return encode_genres(genres_series, genres), genres
+
+
+def build_feature_matrix(df, genre_matrix, genres, numeric_features=None):
+    """Features numériques puis colonnes genre_* : (matrice float32, noms des colonnes)"""
+    if numeric_features is None:
+        numeric_features = [col for col in NUMERIC_FEATURES if col in df.columns]
+    numeric = df[numeric_features].astype('float64').fillna(0).to_numpy(dtype=np.float32)
+    features = np.hstack([numeric, genre_matrix.astype(np.float32)])
+    return features, numeric_features + [f'genre_{genre}' for genre in genres]
+
+
+def feature_scale(features):
+    """Moyennes et écarts-types des features (tableau 2 x F), pour la standardisation"""
+    means = features.mean(axis=0, dtype=np.float64)
+    stds = features.std(axis=0, dtype=np.float64)
+    stds[stds == 0] = 1.0
+    return np.vstack([means, stds]).astype(np.float32)
+
+
+def standardize(features, scale):
+    """Centre-réduit les features avec une échelle calculée par feature_scale()"""
+    return ((features - scale[0]) / scale[1]).astype(np.float32)
+
+
+def nearest_neighbors(queries, points, k, exclude=None):
+    """k plus proches `points` de chaque ligne de `queries` (distance euclidienne, force brute par blocs)
+
+    `exclude` donne, pour chaque requête, la position d'un point à ignorer (le film lui-même).
+    Retourne (positions int32, distances float32), triées par distance croissante.
+    """
+    k = min(k, len(points) - (1 if exclude is not None else 0))
+    positions = np.empty((len(queries), max(k, 0)), dtype=np.int32)
+    distances = np.empty((len(queries), max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return positions, distances
+
+    points_sq = np.einsum('ij,ij->i', points, points)
+    for start in range(0, len(queries), NEIGHBOR_BLOCK_SIZE):
+        block = queries[start:start + NEIGHBOR_BLOCK_SIZE]
+        dist = points_sq[None, :] - 2 * block @ points.T + np.einsum('ij,ij->i', block, block)[:, None]
+        if exclude is not None:
+            dist[np.arange(len(block)), exclude[start:start + NEIGHBOR_BLOCK_SIZE]] = np.inf
+        top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        top_dist = np.take_along_axis(dist, top, axis=1)
+        order = np.argsort(top_dist, axis=1, kind='stable')
+        positions[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.maximum(np.take_along_axis(top_dist, order, axis=1), 0))
+    return positions, distances
+
+
+def compute_neighbors(scaled_features, k=DEFAULT_NEIGHBORS):
+    """Table des k plus proches voisins de chaque film (hors lui-même)"""
+    return nearest_neighbors(scaled_features, scaled_features, k, exclude=np.arange(len(scaled_features)))
@@ -0,0 +1,96 @@
+"""Mesure du coût des imports au démarrage et au premier rendu de chaque page
+
+Usage :
+    python -m cinecreuse.importbench [--script app.py] [--page Accueil ...] [--json resultats.json]
+
+Chaque page est rendue une fois dans un nouveau processus lancé avec `python -X importtime`
+(via streamlit.testing). Le rapport donne, par page, la durée du premier rendu, le temps total
+d'import et le temps cumulé des modules lourds (plotly, scikit-learn, joblib) s'ils ont été importés.
+Les imports faits par le préchauffage en arrière-plan sont inclus. Comparer les rapports de deux
+révisions pour mesurer le gain des imports différés.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Pages rendues par défaut
+DEFAULT_PAGES = ['Accueil', 'Catalogue', 'Recommandation', 'Votre cinéma', 'Admin KPI']
+
+# Modules lourds suivis individuellement
+HEAVY_MODULES = ['plotly', 'sklearn', 'joblib', 'streamlit', 'pandas', 'pyarrow']
+
+_RENDER = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.session_state['page'] = sys.argv[2]
+start = time.perf_counter()
+at.run()
+print(json.dumps({'render_s': time.perf_counter() - start, 'errors': [str(e.value) for e in at.exception]}))
+"""
+
+
+def parse_importtime(stderr):
+    """Sortie de -X importtime : (temps cumulé en µs par module, temps total des imports de premier niveau)"""
+    cumulative = {}
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            cumulative_us = int(fields[1])
+        except ValueError:
+            continue  # Ligne d'en-tête
+        name = fields[2].strip()
+        cumulative.setdefault(name, cumulative_us)
+        if len(fields[2]) - len(fields[2].lstrip()) == 1:
+            total_us += cumulative_us
+    return cumulative, total_us
+
+
+def _package_time(modules, package):
+    """Plus grand temps cumulé (s) parmi les modules du paquet, None s'il n'a pas été importé"""
+    times = [us for name, us in modules.items() if name == package or name.startswith(package + '.')]
+    return round(max(times) / 1e6, 3) if times else None
+
+
+def measure_page(script, page):
+    """Rend `page` dans un processus neuf : durée du rendu et temps d'import par module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _RENDER, str(script), page],
+        capture_output=True, text=True, cwd=Path(script).parent,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Échec du rendu de {page} : {result.stderr.splitlines()[-1:]}")
+    render = json.loads(result.stdout.strip().splitlines()[-1])
+    modules, total_us = parse_importtime(result.stderr)
+    return {
+        'page': page,
+        'render_s': round(render['render_s'], 3),
+        'import_total_s': round(total_us / 1e6, 3),
+        'heavy_modules_s': {name: _package_time(modules, name) for name in HEAVY_MODULES},
+        'errors': render['errors'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import et de premier rendu des pages de l'application")
+    parser.add_argument('--script', default='app.py', help="Script Streamlit à mesurer")
+    parser.add_argument('--page', action='append', help="Page à rendre (répétable, toutes par défaut)")
+    parser.add_argument('--json', help="Fichier où enregistrer les résultats")
+    args = parser.parse_args(argv)
+
+    script = Path(args.script).resolve()
+    results = [measure_page(script, page) for page in args.page or DEFAULT_PAGES]
+    for result in results:
+        heavy = ', '.join(f"{name} {s:.3f}s" for name, s in result['heavy_modules_s'].items() if s is not None)
+        print(f"{result['page']:<15} rendu {result['render_s']:.3f}s  imports {result['import_total_s']:.3f}s  ({heavy})")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""Ingestion hors ligne du catalogue : CSV source -> bundle d'artefacts versionné
+
+Usage :
+    python -m cinecreuse.ingest [--source CSV] [--out artifacts/catalog] [--keep 3] [--chunksize N] [--neighbors K]
+
+Avec --chunksize, le CSV est lu en flux par blocs de N lignes (voir cinecreuse.stream).
+
+Les deltas appliqués à la version publiée (cinecreuse.delta) sont rejoués, dans l'ordre, sur le CSV
+nettoyé : une reconstruction (CSV, règles de nettoyage ou format modifiés) ne les perd pas. Avec
+--drop-deltas (CSV source qui les intègre désormais), ils sont abandonnés.
+"""
+import argparse
+import fcntl
+import hashlib
+import time
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from cinecreuse.bundle import (
+    BUNDLE_FORMAT, DEFAULT_BUNDLE_ROOT, CatalogBundle, bm25_arrays, current_version, delta_rows_path, encode_strings,
+    id_index, new_version, prune_versions, title_index, write_bundle,
+)
+from cinecreuse.catalog import (
+    CLEANING_VERSION, DEFAULT_SOURCE, SOURCE_COLUMNS, clean_movies, compact_catalog, load_movies,
+)
+from cinecreuse.features import (
+    DEFAULT_NEIGHBORS, build_feature_matrix, build_genre_matrix, compute_neighbors, feature_scale, standardize,
+)
+from cinecreuse.search import BM25Index
+from cinecreuse.stream import read_partitions, stream_to_partitions
+from cinecreuse.toplists import build_top_lists
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Calcule le SHA-256 d'un fichier par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _catalog_stats(df, genre_matrix, genres):
+    """Statistiques descriptives du catalogue nettoyé"""
+    genre_counts = genre_matrix.sum(axis=0)
+    return {
+        'n_movies': len(df),
+        'n_genres': len(genres),
+        'genre_counts': {genre: int(count) for genre, count in zip(genres, genre_counts)},
+        'missing_posters': int(df['poster_path'].isna().sum()) if 'poster_path' in df.columns else None,
+        'year_min': int(df['year'].min()) if df['year'].notna().any() else None,
+        'year_max': int(df['year'].max()) if df['year'].notna().any() else None,
+        'null_counts': {col: int(n) for col, n in df.isna().sum().items() if n},
+    }
+
+
+def _memory_stats(raw_df, compact_df, offloaded):
+    """Empreinte mémoire (memory_usage(deep=True)) avant et après compaction, par colonne
+
+    Le gain de la compaction porte sur les mêmes colonnes de part et d'autre. Les colonnes sorties
+    du catalogue (`offloaded` : colonne -> octets de son stockage dans le bundle) sont comptées à part.
+    """
+    raw = raw_df.memory_usage(deep=True, index=False)
+    compact = compact_df.memory_usage(deep=True, index=False)
+    kept = raw.drop(list(offloaded))
+    return {
+        'raw_bytes': int(kept.sum()),
+        'compact_bytes': int(compact.sum()),
+        'columns': {
+            col: {'raw_bytes': int(kept[col]), 'compact_bytes': int(compact.get(col, 0))}
+            for col in kept.index
+        },
+        'offloaded': {
+            col: {'raw_bytes': int(raw[col]), 'stored_bytes': int(stored)}
+            for col, stored in offloaded.items()
+        },
+    }
+
+
+def replay_deltas(df, root, deltas):
+    """Réapplique au catalogue nettoyé les deltas enregistrés, dans l'ordre : (catalogue, deltas rejoués)
+
+    Comme apply_delta(), un film dont le movie_id existe est remplacé à sa position, les autres sont
+    ajoutés en fin de catalogue. Un delta sans lignes enregistrées est signalé puis ignoré.
+    """
+    replayed = []
+    for delta in deltas:
+        path = delta_rows_path(root, delta['rows']) if delta.get('rows') else None
+        if path is None or not path.exists():
+            warnings.warn(f"Delta du {delta.get('applied_at')} sans lignes enregistrées : "
+                          "absent du catalogue reconstruit", stacklevel=2)
+            continue
+        rows = clean_movies(pd.read_csv(path, usecols=lambda col: col in SOURCE_COLUMNS)).reset_index(drop=True)
+        existing = pd.Index(df['movie_id']).get_indexer(rows['movie_id'])
+        is_update = existing >= 0
+        rows = rows.reindex(columns=df.columns)
+        for col in df.columns:
+            df.loc[existing[is_update], col] = rows.loc[is_update, col].to_numpy()
+        df = pd.concat([df, rows[~is_update]], ignore_index=True)
+        replayed.append(delta)
+    return df, replayed
+
+
+def build_arrays(df, genre_matrix, features, synopsis_index, n_neighbors=DEFAULT_NEIGHBORS):
+    """Tableaux dérivés du catalogue à enregistrer dans le bundle"""
+    scale = feature_scale(features)
+    arrays = {
+        'genres': genre_matrix,
+        'features': features,
+        'feature_scale': scale,
+        **bm25_arrays(synopsis_index),
+    }
+    arrays['top_rated'], arrays['top_rated_by_genre'] = build_top_lists(df['averageRating'], genre_matrix)
+    arrays['title_keys'], arrays['title_positions'] = title_index(df['title_x'])
+    arrays['id_keys'], arrays['id_positions'] = id_index(df['movie_id'])
+    arrays['synopsis_blob'], arrays['synopsis_offsets'] = encode_strings(df['description'])
+    if n_neighbors:
+        arrays['neighbors'], arrays['neighbor_distances'] = compute_neighbors(standardize(features, scale), n_neighbors)
+    return arrays
+
+
+def ingest(source=DEFAULT_SOURCE, root=DEFAULT_BUNDLE_ROOT, keep=3, chunksize=None, n_neighbors=DEFAULT_NEIGHBORS,
+           drop_deltas=False):
+    """Nettoie le CSV source, calcule les artefacts et publie une nouvelle version du bundle
+
+    Si `chunksize` est fourni, le nettoyage se fait en flux et produit des partitions Parquet
+    dans <root>/.partitions/ avant la construction du bundle. Les deltas de la version publiée sont
+    rejoués, sauf avec `drop_deltas`. Le verrou d'ingestion est tenu jusqu'à la publication : un
+    delta appliqué en même temps attend la nouvelle version.
+    """
+    with _ingest_lock(root):
+        return _ingest(source, root, keep, chunksize, n_neighbors, drop_deltas)
+
+
+def _ingest(source, root, keep=3, chunksize=None, n_neighbors=DEFAULT_NEIGHBORS, drop_deltas=False):
+    timings = {}
+    stats = {}
+
+    start = time.perf_counter()
+    source_hash = file_hash(source)
+    if chunksize:
+        partitions = stream_to_partitions(source, Path(root) / '.partitions' / source_hash[:16], chunksize, stats)
+        stats['partitions'] = len(partitions)
+        df = read_partitions(partitions)
+    else:
+        df = load_movies(source, stats).reset_index(drop=True)
+    deltas = []
+    if not drop_deltas and current_version(root) is not None:
+        df, deltas = replay_deltas(df, root, CatalogBundle.open_current(root).manifest.get('deltas', []))
+    timings['clean'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    genre_matrix, genres = build_genre_matrix(df['genres_x'])
+    features, feature_columns = build_feature_matrix(df, genre_matrix, genres)
+    timings['features'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if 'description' not in df.columns:
+        df['description'] = ''
+    synopsis_index = BM25Index.build(df['description'].tolist())
+    timings['synopsis_index'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrays = build_arrays(df, genre_matrix, features, synopsis_index, n_neighbors)
+    timings['neighbors'] = time.perf_counter() - start
+
+    # Les synopsis sont servis depuis leur blob : ils ne font pas partie des colonnes du catalogue
+    compact_df = compact_catalog(df).drop(columns=['description'])
+
+    created_at = datetime.now(timezone.utc)
+    version = new_version(created_at, source_hash)
+    report = {
+        'source': str(source),
+        'source_hash': source_hash,
+        'cleaning': stats,
+        'deltas_replayed': len(deltas),
+        'catalog': _catalog_stats(df, genre_matrix, genres),
+        'memory': _memory_stats(df, compact_df, {
+            'description': arrays['synopsis_blob'].nbytes + arrays['synopsis_offsets'].nbytes,
+        }),
+        'timings_s': {step: round(seconds, 3) for step, seconds in timings.items()},
+    }
+    path = write_bundle(
+        root, version, compact_df, arrays,
+        manifest_extra={
+            'genres': genres,
+            'feature_columns': feature_columns,
+            'created_at': created_at.isoformat(),
+            'source': str(source),
+            'source_hash': source_hash,
+            'cleaning_version': CLEANING_VERSION,
+            'deltas': deltas,
+        },
+        stats=report,
+    )
+    prune_versions(root, keep)
+    return path, report
+
+
+def is_up_to_date(source=DEFAULT_SOURCE, root=DEFAULT_BUNDLE_ROOT):
+    """Vrai si la version publiée correspond au contenu actuel du CSV, aux règles de nettoyage et au format"""
+    if current_version(root) is None:
+        return False
+    manifest = CatalogBundle.open_current(root).manifest
+    return (manifest.get('format') == BUNDLE_FORMAT
+            and manifest.get('cleaning_version') == CLEANING_VERSION
+            and manifest.get('source_hash') == file_hash(source))
+
+
+@contextmanager
+def _ingest_lock(root):
+    """Verrou exclusif entre processus sur la publication (ingestion ou delta) : les autres attendent
+
+    Non réentrant : une fonction qui le tient appelle les variantes sans verrou (_ingest, _apply_delta).
+    """
+    Path(root).mkdir(parents=True, exist_ok=True)
+    with open(Path(root) / '.ingest.lock', 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def ensure_bundle(source=DEFAULT_SOURCE, root=DEFAULT_BUNDLE_ROOT):
+    """Ouvre le bundle publié, en le reconstruisant d'abord s'il est absent ou périmé"""
+    if not is_up_to_date(source, root):
+        with _ingest_lock(root):
+            # Un autre worker a pu publier la version pendant l'attente du verrou
+            if not is_up_to_date(source, root):
+                _ingest(source, root)
+    return CatalogBundle.open_current(root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion du catalogue CinéCreuse+ en bundle d'artefacts")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="CSV source du catalogue")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Racine des bundles versionnés")
+    parser.add_argument('--keep', type=int, default=3, help="Nombre de versions conservées")
+    parser.add_argument('--chunksize', type=int, default=None, help="Lecture en flux par blocs de N lignes")
+    parser.add_argument('--neighbors', type=int, default=DEFAULT_NEIGHBORS,
+                        help="Voisins précalculés par film (0 pour désactiver)")
+    parser.add_argument('--drop-deltas', action='store_true',
+                        help="Ne pas rejouer les deltas de la version publiée (CSV source qui les intègre)")
+    args = parser.parse_args(argv)
+
+    path, report = ingest(args.source, args.out, args.keep, args.chunksize, args.neighbors, args.drop_deltas)
+    cleaning = report['cleaning']
+    print(f"Bundle publié : {path}")
+    print(f"  Lignes lues      : {cleaning['rows_read']}")
+    print(f"  Doublons écartés : {cleaning['dropped_duplicates']}")
+    print(f"  Valeurs absentes : {cleaning['dropped_missing']}")
+    print(f"  Durée nulle      : {cleaning['dropped_runtime']}")
+    print(f"  Note nulle       : {cleaning['dropped_rating']}")
+    print(f"  Films conservés  : {cleaning['rows_kept']}")
+    print(f"  Deltas rejoués   : {report['deltas_replayed']}")
+    print(f"  Genres           : {report['catalog']['n_genres']}")
+    memory = report['memory']
+    print(f"  Mémoire          : {memory['raw_bytes'] / 1024**2:.1f} Mo -> {memory['compact_bytes'] / 1024**2:.1f} Mo")
+    for col, sizes in memory['offloaded'].items():
+        print(f"  Hors catalogue   : {col} {sizes['raw_bytes'] / 1024**2:.1f} Mo -> "
+              f"{sizes['stored_bytes'] / 1024**2:.1f} Mo mappés")
+    for step, seconds in report['timings_s'].items():
+        print(f"  Temps {step:<14}: {seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+"""Indicateurs agrégés du catalogue pour la page KPI"""
+
+# Colonnes du tableau des films les mieux notés
+TOP_FILMS_COLUMNS = ['title_x', 'averageRating', 'year', 'genres_x', 'runtime']
+
+
+def catalog_kpis(df):
+    """Métriques, répartitions et top 10 du catalogue"""
+    genres = df['genres_x'].str.split(',').explode()
+    return {
+        'total_films': len(df),
+        'avg_rating': float(df['averageRating'].mean()),
+        'total_runtime': float(df['runtime'].sum()),
+        'high_rated': int((df['averageRating'] >= 7.5).sum()),
+        'recent_films': int((df['year'] >= 2020).sum()),
+        'unique_genres': len(genres.unique()),
+        'avg_runtime': float(df['runtime'].mean()),
+        'blockbusters': int((df['runtime'] >= 150).sum()),
+        'short_films': int((df['runtime'] <= 90).sum()),
+        'top_genres': genres.str.strip().value_counts().head(8),
+        'decade_counts': ((df['year'] // 10) * 10).value_counts().sort_index(),
+        'top_films': df.nlargest(10, 'averageRating')[TOP_FILMS_COLUMNS],
+    }
@@ -0,0 +1,156 @@
+"""Test de charge local de l'API (cinecreuse.api) : débit et latences de queue
+
+Usage :
+    python -m cinecreuse.loadtest [--url http://127.0.0.1:8600] [--requests 2000] [--concurrency 32]
+                                  [--mix recommend,search,synopsis,movie,page] [--json resultats.json]
+
+Chaque client garde sa connexion ouverte (keep-alive) et enchaîne ses requêtes. Les films
+interrogés sont tirés du catalogue servi par l'API.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+# Requêtes plein texte tirées au hasard pour la recherche dans les synopsis
+SYNOPSIS_QUERIES = ['love', 'war', 'detective', 'family secret', 'space', 'heist', 'paris', 'revenge', 'robot', 'ghost']
+
+# Répartition par défaut des types de requêtes
+DEFAULT_MIX = ['recommend', 'recommend', 'search', 'synopsis', 'movie', 'page']
+
+
+class Client:
+    """Connexion HTTP/1.1 keep-alive minimale vers l'API"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _make_path(kind, movie_ids, titles, rng):
+    if kind == 'recommend':
+        return f"/recommend?movie_id={rng.choice(movie_ids)}&n=6"
+    if kind == 'search':
+        title = rng.choice(titles)
+        return f"/search?q={quote(title[:max(3, len(title) // 2)])}&limit=10"
+    if kind == 'synopsis':
+        return f"/search?field=synopsis&q={quote(rng.choice(SYNOPSIS_QUERIES))}&limit=10"
+    if kind == 'movie':
+        return f"/movies/{rng.choice(movie_ids)}"
+    return f"/movies?page={rng.randint(1, 20)}&per_page=24&sort=averageRating"
+
+
+async def run(url, n_requests, concurrency, mix, seed=0):
+    """Envoie `n_requests` requêtes avec `concurrency` clients ; retourne le rapport de latences"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    rng = random.Random(seed)
+
+    probe = Client(host, port)
+    _, sample = await probe.get('/movies?per_page=100&sort=numVotes')
+    await probe.close()
+    movie_ids = [movie['movie_id'] for movie in sample['movies']]
+    titles = [movie['title_x'] for movie in sample['movies']]
+
+    paths = [(kind, _make_path(kind, movie_ids, titles, rng)) for kind in (rng.choice(mix) for _ in range(n_requests))]
+    latencies = {kind: [] for kind in set(mix)}
+    errors = []
+    queue = iter(paths)
+
+    async def worker():
+        client = Client(host, port)
+        try:
+            for kind, path in queue:
+                start = time.perf_counter()
+                try:
+                    status, _ = await client.get(path)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    errors.append(f"{path}: {e!r}")
+                    client = Client(host, port)
+                    continue
+                latencies[kind].append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(f"{path}: HTTP {status}")
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    def summary(values):
+        values = np.asarray(values) * 1000
+        if not len(values):
+            return None
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {'count': len(values), 'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'p99_ms': round(p99, 2),
+                'max_ms': round(values.max(), 2)}
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(all_latencies) / elapsed, 1),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'latency': summary(all_latencies),
+        'latency_by_kind': {kind: summary(values) for kind, values in sorted(latencies.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API CinéCreuse+")
+    parser.add_argument('--url', default='http://127.0.0.1:8600', help="Adresse de l'API")
+    parser.add_argument('--requests', type=int, default=2000, help="Nombre total de requêtes")
+    parser.add_argument('--concurrency', type=int, default=32, help="Clients simultanés")
+    parser.add_argument('--mix', default=','.join(DEFAULT_MIX),
+                        help="Types de requêtes tirés au hasard (recommend, search, synopsis, movie, page)")
+    parser.add_argument('--json', help="Fichier où enregistrer le rapport")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.url, args.requests, args.concurrency, args.mix.split(',')))
+    latency = report['latency']
+    print(f"{report['requests']} requêtes, {report['concurrency']} clients, {report['elapsed_s']:.2f}s")
+    print(f"  Débit   : {report['throughput_rps']:.1f} req/s")
+    print(f"  Erreurs : {report['errors']}")
+    if latency:
+        print(f"  Latence : p50 {latency['p50_ms']:.1f} ms  p95 {latency['p95_ms']:.1f} ms  "
+              f"p99 {latency['p99_ms']:.1f} ms  max {latency['max_ms']:.1f} ms")
+    for kind, stats in report['latency_by_kind'].items():
+        if stats:
+            print(f"    {kind:<10} n={stats['count']:<5} p50 {stats['p50_ms']:.1f}  p95 {stats['p95_ms']:.1f}  "
+                  f"p99 {stats['p99_ms']:.1f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
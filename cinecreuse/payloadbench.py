@@ -0,0 +1,84 @@
+"""Mesure du volume envoyé au navigateur à chaque rerun, par page
+
+Usage :
+    python -m cinecreuse.payloadbench [--script app.py] [--page Accueil ...] [--baseline avant.json]
+                                      [--json resultats.json]
+
+Chaque page est rendue via streamlit.testing. Le rapport compte les messages envoyés au navigateur
+(ForwardMsg) lors d'un rerun complet : nombre de messages, nombre d'éléments (deltas) et octets
+sérialisés, soit ce qui transite sur le websocket. Avec --baseline, le rapport d'une révision
+précédente est affiché en regard (avant -> après).
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+# Pages rendues par défaut
+DEFAULT_PAGES = ['Accueil', 'Catalogue', 'Recommandation', 'Votre cinéma', 'Admin KPI']
+
+
+def measure_page(script, page):
+    """Rend `page` une fois : messages, éléments et octets envoyés pendant le rerun"""
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    sent = []
+    original_run = LocalScriptRunner.run
+
+    def run(self, *args, **kwargs):
+        tree = original_run(self, *args, **kwargs)
+        sent[:] = list(self.forward_msgs())
+        return tree
+
+    LocalScriptRunner.run = run
+    try:
+        at = AppTest.from_file(str(script), default_timeout=600)
+        at.session_state['page'] = page
+        at.run()
+    finally:
+        LocalScriptRunner.run = original_run
+
+    return {
+        'page': page,
+        'messages': len(sent),
+        'elements': sum(msg.HasField('delta') for msg in sent),
+        'bytes': sum(msg.ByteSize() for msg in sent),
+        'errors': [str(e.value) for e in at.exception],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Volume envoyé au navigateur par rerun, pour chaque page")
+    parser.add_argument('--script', default='app.py', help="Script Streamlit à rendre")
+    parser.add_argument('--page', action='append', help="Page à rendre (plusieurs fois possible, toutes par défaut)")
+    parser.add_argument('--baseline', help="Rapport JSON d'une révision précédente à comparer")
+    parser.add_argument('--json', help="Fichier où enregistrer le rapport")
+    args = parser.parse_args(argv)
+
+    script = Path(args.script).resolve()
+    os.chdir(script.parent)  # Les chemins des données sont relatifs au script
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = {row['page']: row for row in json.load(f)}
+
+    report = []
+    for page in args.page or DEFAULT_PAGES:
+        row = measure_page(script, page)
+        report.append(row)
+        line = f"{page:<16} {row['elements']:>6} éléments  {row['bytes'] / 1024:>9.1f} Ko"
+        if page in baseline:
+            before = baseline[page]
+            line += f"   (avant : {before['elements']} éléments, {before['bytes'] / 1024:.1f} Ko)"
+        print(line)
+        for error in row['errors']:
+            print(f"    erreur : {error}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""Cache local des affiches en vignettes (w185, w342), servi par les fichiers statiques de Streamlit
+
+Usage :
+    python -m cinecreuse.posters [--origin URL|DOSSIER] [--dir static/posters] [--max-mb 512] [--limit N]
+
+Chaque affiche est téléchargée une fois depuis l'origine (TMDB en w500 par défaut, ou un dossier local / un
+serveur de test via --origin ou CINECREUSE_POSTER_ORIGIN), réduite aux largeurs affichées et
+enregistrée en JPEG :
+
+    static/posters/w185/<fichier>.jpg    cartes et carrousels (affichées en 150-180 px)
+    static/posters/w342/<fichier>.jpg    écrans haute densité
+
+    static/posters/colors.json           couleur dominante de chaque affiche (fond affiché pendant le chargement)
+
+Avec `enableStaticServing`, Streamlit sert ce dossier sous /app/static/posters. Dès que la taille
+totale dépasse la limite, les affiches les moins récemment affichées sont supprimées. Dans
+l'application, les affiches absentes sont demandées à un thread d'arrière-plan et les tailles
+équivalentes de TMDB sont utilisées en attendant. En ligne de commande, le cache est rempli pour
+tout le catalogue, films les mieux notés d'abord, puis les couleurs dominantes sont enregistrées.
+"""
+import argparse
+import io
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from urllib.request import urlopen
+
+from cinecreuse.bundle import DEFAULT_BUNDLE_ROOT, CatalogBundle
+
+# Largeurs des vignettes (nom de taille TMDB -> pixels)
+POSTER_SIZES = {'w185': 185, 'w342': 342}
+
+# Taille utilisée par les cartes et les carrousels
+CARD_POSTER_SIZE = 'w185'
+
+# Répertoire des vignettes, sous le dossier static/ servi par Streamlit
+DEFAULT_POSTER_DIR = 'static/posters'
+
+# URL sous laquelle Streamlit sert ce répertoire
+STATIC_URL = '/app/static/posters'
+
+# Images TMDB redimensionnées (<base>/<taille><chemin>), utilisées tant que la vignette locale manque
+TMDB_IMAGE_URL = 'https://image.tmdb.org/t/p'
+
+# Largeur d'affichage des affiches dans les cartes (attribut sizes des images)
+CARD_DISPLAY_WIDTH = '180px'
+
+# Fichier des couleurs dominantes, dans le répertoire des vignettes
+COLORS_FILE = 'colors.json'
+
+# Origine des affiches à réduire (URL ou dossier local) : w500 suffit pour la vignette w342 et pèse
+# bien moins que l'original
+DEFAULT_ORIGIN = 'https://image.tmdb.org/t/p/w500'
+ORIGIN_ENV = 'CINECREUSE_POSTER_ORIGIN'
+
+# Taille maximale du cache sur disque
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+# Qualité JPEG des vignettes et délai maximal d'un téléchargement (secondes)
+JPEG_QUALITY = 82
+FETCH_TIMEOUT = 10
+
+# Affiches en attente de téléchargement au-delà desquelles les nouvelles demandes sont ignorées
+MAX_PENDING = 1000
+
+# Délai maximal (secondes) avant l'enregistrement des couleurs calculées par le thread de téléchargement
+COLORS_SAVE_INTERVAL = 30
+
+
+def poster_origin():
+    """Origine configurée des affiches (variable d'environnement, sinon TMDB)"""
+    return os.environ.get(ORIGIN_ENV, DEFAULT_ORIGIN)
+
+
+def fetch_source(origin, poster_path):
+    """Octets de l'affiche `poster_path` ('/abc.jpg') depuis une URL de base ou un dossier local"""
+    if origin.startswith(('http://', 'https://')):
+        with urlopen(origin.rstrip('/') + poster_path, timeout=FETCH_TIMEOUT) as response:
+            return response.read()
+    return (Path(origin) / poster_path.lstrip('/')).read_bytes()
+
+
+def make_thumbnail(data, width):
+    """Vignette JPEG de `width` pixels de large (jamais agrandie), proportions conservées"""
+    from PIL import Image  # Import différé : Pillow ne sert qu'au remplissage du cache
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGB')
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def dominant_color(data):
+    """Couleur dominante d'une image ('#rrggbb') : couleur la plus fréquente d'une palette de 4 teintes"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        palette = image.convert('RGB').resize((32, 48)).quantize(4)
+        _, index = max(palette.getcolors())
+        red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def srcset(urls):
+    """Attribut srcset à partir des URL par taille ({'w185': url, ...})"""
+    return ', '.join(f"{url} {POSTER_SIZES[size]}w" for size, url in urls.items())
+
+
+def remote_image(poster_path):
+    """Affiche servie par TMDB : (src, srcset, couleur) aux mêmes tailles que les vignettes, None sans affiche"""
+    if poster_name(poster_path) is None:
+        return None
+    urls = {size: f"{TMDB_IMAGE_URL}/{size}{poster_path}" for size in POSTER_SIZES}
+    return urls[CARD_POSTER_SIZE], srcset(urls), None
+
+
+def poster_name(poster_path):
+    """Nom de fichier d'une affiche ('/abc.jpg' -> 'abc.jpg'), None si le chemin n'est pas un simple fichier"""
+    if not isinstance(poster_path, str):
+        return None
+    name = poster_path.lstrip('/')
+    if not name or '/' in name or name.startswith('.'):
+        return None
+    return name
+
+
+class PosterCache:
+    """Vignettes d'affiches sur disque, bornées en taille (éviction LRU), remplies en arrière-plan
+
+    L'index en mémoire (nom -> octets de toutes les tailles) est ordonné du moins au plus récemment
+    affiché ; au démarrage, l'ordre est celui des dates de modification des fichiers. Chaque worker a
+    son index : une affiche supprimée par l'éviction d'un autre worker est retirée de l'index (puis
+    téléchargée de nouveau) dès que has() constate l'absence de ses fichiers.
+    """
+
+    def __init__(self, directory=DEFAULT_POSTER_DIR, origin=None, max_bytes=DEFAULT_MAX_BYTES, url_prefix=STATIC_URL):
+        self.directory = Path(directory)
+        self.origin = origin or poster_origin()
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix
+        self.fetched = 0
+        self.errors = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._queue = queue.Queue(maxsize=MAX_PENDING)
+        self._worker = None
+        self._colors_dirty = False
+        self.colors = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.scan()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Taille totale des vignettes (octets)"""
+        with self._lock:
+            return sum(self._entries.values())
+
+    def path(self, name, size):
+        return self.directory / size / name
+
+    def scan(self):
+        """Reconstruit l'index à partir des fichiers présents (affiches complètes seulement)"""
+        found = {}
+        for size in POSTER_SIZES:
+            folder = self.directory / size
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder):
+                if entry.is_file() and not entry.name.startswith('.'):
+                    stat = entry.stat()
+                    found.setdefault(entry.name, {})[size] = (stat.st_size, stat.st_mtime)
+        complete = [(name, sizes) for name, sizes in found.items() if len(sizes) == len(POSTER_SIZES)]
+        complete.sort(key=lambda item: max(mtime for _, mtime in item[1].values()))
+        try:
+            colors = json.loads((self.directory / COLORS_FILE).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            colors = {}
+        with self._lock:
+            self._entries = OrderedDict((name, sum(size for size, _ in sizes.values())) for name, sizes in complete)
+            self.colors = {name: colors[name] for name in self._entries if name in colors}
+
+    def save_colors(self):
+        """Enregistre les couleurs dominantes connues (écriture atomique)
+
+        Les couleurs déjà enregistrées par d'autres processus sont conservées tant que leur vignette existe.
+        """
+        target = self.directory / COLORS_FILE
+        try:
+            saved = json.loads(target.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            saved = {}
+        with self._lock:
+            self._colors_dirty = False
+            colors = {**saved, **self.colors}
+        colors = {name: color for name, color in colors.items() if self.path(name, CARD_POSTER_SIZE).exists()}
+        tmp = target.with_name(f".{COLORS_FILE}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(colors, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, target)
+
+    def compute_colors(self):
+        """Calcule la couleur dominante des vignettes en cache qui n'en ont pas encore ; retourne leur nombre"""
+        with self._lock:
+            missing = [name for name in self._entries if name not in self.colors]
+        computed = 0
+        for name in missing:
+            try:
+                color = dominant_color(self.path(name, CARD_POSTER_SIZE).read_bytes())
+            except OSError:
+                continue  # Vignette supprimée entre-temps
+            with self._lock:
+                self.colors[name] = color
+            computed += 1
+        return computed
+
+    def has(self, poster_path):
+        """Vrai si les vignettes de l'affiche sont sur disque (l'affiche devient la plus récemment utilisée)"""
+        name = poster_name(poster_path)
+        with self._lock:
+            if name not in self._entries:
+                return False
+        if all(self.path(name, size).exists() for size in POSTER_SIZES):
+            with self._lock:
+                if name in self._entries:
+                    self._entries.move_to_end(name)
+            return True
+        with self._lock:
+            self._entries.pop(name, None)
+            self.colors.pop(name, None)
+        return False
+
+    def image(self, poster_path):
+        """(src, srcset, couleur dominante) d'une affiche : vignettes locales, sinon tailles TMDB"""
+        name = poster_name(poster_path)
+        if name is None:
+            return None
+        if not self.has(poster_path):
+            self.request(poster_path)
+            return remote_image(poster_path)
+        urls = {size: f"{self.url_prefix}/{size}/{name}" for size in POSTER_SIZES}
+        return urls[CARD_POSTER_SIZE], srcset(urls), self.colors.get(name)
+
+    def store(self, poster_path):
+        """Télécharge une affiche et enregistre toutes ses vignettes ; retourne False si le chemin est invalide"""
+        name = poster_name(poster_path)
+        if name is None:
+            return False
+        data = fetch_source(self.origin, poster_path)
+        total = 0
+        for size, width in POSTER_SIZES.items():
+            target = self.path(name, size)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(make_thumbnail(data, width))
+            os.replace(tmp, target)  # Écriture atomique : jamais de vignette tronquée servie
+            total += target.stat().st_size
+        color = dominant_color(self.path(name, CARD_POSTER_SIZE).read_bytes())
+        with self._lock:
+            self._entries[name] = total
+            self._entries.move_to_end(name)
+            self.colors[name] = color
+            self._colors_dirty = True
+        self.fetched += 1
+        self.evict()
+        return True
+
+    def evict(self):
+        """Supprime les affiches les moins récemment affichées jusqu'à repasser sous la limite"""
+        removed = []
+        with self._lock:
+            total = sum(self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                name, size = self._entries.popitem(last=False)
+                self.colors.pop(name, None)
+                total -= size
+                removed.append(name)
+        for name in removed:
+            for size in POSTER_SIZES:
+                self.path(name, size).unlink(missing_ok=True)
+        return removed
+
+    def request(self, poster_path):
+        """Demande le téléchargement d'une affiche absente au thread d'arrière-plan (sans attendre)"""
+        name = poster_name(poster_path)
+        if name is None:
+            return
+        with self._lock:
+            if name in self._pending or name in self._entries:
+                return
+            try:
+                self._queue.put_nowait(poster_path)
+            except queue.Full:
+                return
+            self._pending.add(name)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._fetch_pending, name='cinecreuse-posters', daemon=True)
+                self._worker.start()
+
+    def _fetch_pending(self):
+        """Boucle du thread de téléchargement ; les couleurs sont enregistrées dès que la file se vide
+        (au plus tard toutes les COLORS_SAVE_INTERVAL secondes), pour survivre à un redémarrage"""
+        saved_at = time.monotonic()
+        while True:
+            poster_path = self._queue.get()
+            try:
+                self.store(poster_path)
+            except Exception:
+                self.errors += 1  # Affiche indisponible : l'URL d'origine reste utilisée
+            finally:
+                with self._lock:
+                    self._pending.discard(poster_name(poster_path))
+            if self._colors_dirty and (self._queue.empty() or time.monotonic() - saved_at >= COLORS_SAVE_INTERVAL):
+                try:
+                    self.save_colors()
+                except OSError:
+                    self._colors_dirty = True  # Nouvel essai après le prochain téléchargement
+                saved_at = time.monotonic()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remplit le cache local des vignettes d'affiches")
+    parser.add_argument('--origin', default=poster_origin(), help="URL de base ou dossier des affiches à réduire")
+    parser.add_argument('--dir', default=DEFAULT_POSTER_DIR, help="Répertoire des vignettes")
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024**2, help="Taille maximale du cache (Mo)")
+    parser.add_argument('--limit', type=int, help="Nombre maximal d'affiches à télécharger")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Répertoire des bundles")
+    args = parser.parse_args(argv)
+
+    cache = PosterCache(args.dir, args.origin, int(args.max_mb * 1024**2))
+    bundle = CatalogBundle.open_current(args.out)
+    poster_paths = bundle.frame(['poster_path'])['poster_path'].to_numpy()
+
+    # Films les mieux notés d'abord : ce sont ceux de la page d'accueil
+    ranked = list(dict.fromkeys(bundle.top_rated.tolist() + list(range(len(poster_paths)))))
+    stored = failed = 0
+    for position in ranked:
+        if args.limit is not None and stored >= args.limit:
+            break
+        poster_path = poster_paths[position]
+        if poster_name(poster_path) is None or cache.has(poster_path):
+            continue
+        try:
+            stored += cache.store(poster_path)
+        except Exception as e:
+            failed += 1
+            print(f"  échec {poster_path} : {e!r}")
+    # Couleurs dominantes des vignettes (y compris celles ajoutées par l'application)
+    computed = cache.compute_colors()
+    cache.save_colors()
+    print(f"{stored} affiches ajoutées, {failed} échecs, {len(cache)} en cache ({cache.size / 1024**2:.1f} Mo), "
+          f"{computed} couleurs calculées")
+
+
+if __name__ == '__main__':
+    main()
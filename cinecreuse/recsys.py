@@ -0,0 +1,169 @@
+"""Recherche de films par titre et recommandations
+
+Ordre de repli des recommandations : voisins précalculés du bundle, puis modèle KNN sur les
+features du bundle, puis score de similarité simple (genres, note, époque).
+"""
+import numpy as np
+import pandas as pd
+
+from cinecreuse.features import DEFAULT_MODEL_PATH
+
+
+def load_model(path=DEFAULT_MODEL_PATH):
+    """Charge le modèle KNN entraîné hors ligne (tableaux en mmap, partagés entre workers)"""
+    import joblib  # Import différé : joblib et scikit-learn ne servent qu'aux recommandations
+
+    return joblib.load(path, mmap_mode='r')
+
+
+def find_movie_by_name(movie_title, df, bundle=None):
+    """Trouve un film par son nom avec recherche flexible (exacte puis partielle, insensible à la casse)"""
+    if not movie_title or movie_title.strip() == "":
+        return None
+
+    movie_title = movie_title.strip().lower()
+
+    # Recherche exacte via l'index des titres du bundle, sinon par comparaison des titres
+    if bundle is not None:
+        position = bundle.find_title(movie_title)
+        if position is not None:
+            return df.iloc[position]
+    else:
+        exact_match = df[df['title_x'].str.lower() == movie_title]
+        if not exact_match.empty:
+            return exact_match.iloc[0]
+
+    # Recherche partielle
+    partial_match = df[df['title_x'].str.lower().str.contains(movie_title, na=False)]
+    if not partial_match.empty:
+        return partial_match.iloc[0]
+
+    return None
+
+
+def search_titles(df, query, bundle=None, limit=20):
+    """Positions des films dont le titre commence par `query`, puis de ceux qui le contiennent"""
+    query = query.strip().lower()
+    if not query:
+        return np.empty(0, dtype=np.int32)
+
+    positions = np.empty(0, dtype=np.int32)
+    if bundle is not None:
+        # Préfixe : plage contiguë de l'index trié des titres
+        keys = bundle.title_keys
+        start = np.searchsorted(keys, query, side='left')
+        end = np.searchsorted(keys, query + '\uffff', side='left')
+        positions = np.sort(np.asarray(bundle.title_positions[start:end]))[:limit]
+
+    if len(positions) < limit:
+        contains = np.flatnonzero(df['title_x'].str.lower().str.contains(query, na=False, regex=False).to_numpy())
+        contains = contains[~np.isin(contains, positions)]
+        positions = np.concatenate([positions, contains[:limit - len(positions)]])
+    return positions.astype(np.int32)
+
+
+def get_simple_recommendations(movie_data, df, n_recommendations=5):
+    """Système de recommandation simple basé sur les genres et notes"""
+    # Extraire les informations du film de référence
+    movie_genres = str(movie_data.get('genres_x', '')).lower()
+
+    # Utiliser la note disponible (priorité à averageRating, sinon vote_average)
+    movie_rating = movie_data.get('averageRating', movie_data.get('vote_average', 5.0))
+
+    # Extraire l'année (de year ou de release_date)
+    movie_year = movie_data.get('year', 2000)
+    if pd.isna(movie_year) and 'release_date' in movie_data:
+        try:
+            movie_year = pd.to_datetime(movie_data['release_date']).year
+        except Exception:
+            movie_year = 2000
+
+    # Calculer un score de similarité pour chaque film
+    scores = []
+    for idx, row in df.iterrows():
+        try:
+            if row['title_x'] == movie_data['title_x']:
+                continue  # Exclure le film lui-même
+
+            score = 0
+
+            # Similarité de genre (poids 50%)
+            row_genres = str(row.get('genres_x', '')).lower()
+            if movie_genres and row_genres and movie_genres != 'nan' and row_genres != 'nan':
+                movie_genre_list = [g.strip() for g in movie_genres.split(',')]
+                common_genres = 0
+                for genre in movie_genre_list:
+                    if genre and genre in row_genres:
+                        common_genres += 1
+                if common_genres > 0:
+                    score += (common_genres / len(movie_genre_list)) * 0.5
+
+            # Similarité de note (poids 30%)
+            row_rating = row.get('averageRating', row.get('vote_average', 5.0))
+            if pd.notna(row_rating) and pd.notna(movie_rating):
+                rating_diff = abs(float(movie_rating) - float(row_rating))
+                rating_score = max(0, 1 - rating_diff / 10) * 0.3
+                score += rating_score
+
+            # Similarité d'époque (poids 20%)
+            row_year = row.get('year', 2000)
+            if pd.isna(row_year) and 'release_date' in row:
+                try:
+                    row_year = pd.to_datetime(row['release_date']).year
+                except Exception:
+                    row_year = 2000
+
+            if pd.notna(row_year) and pd.notna(movie_year):
+                year_diff = abs(int(movie_year) - int(row_year))
+                year_score = max(0, 1 - year_diff / 50) * 0.2
+                score += year_score
+
+            scores.append((idx, score))
+
+        except Exception:
+            continue  # Ignorer les erreurs sur des lignes individuelles
+
+    # Trier par score et prendre les meilleurs
+    if scores:
+        scores.sort(key=lambda x: x[1], reverse=True)
+        top_indices = [idx for idx, score in scores[:n_recommendations] if score > 0]
+        if top_indices:
+            return df.iloc[top_indices].to_dict('records')
+
+    # Si aucune recommandation trouvée, retourner des films populaires du même genre
+    if movie_genres and movie_genres != 'nan':
+        genre_filter = df[df['genres_x'].str.contains(movie_genres.split(',')[0].strip(), na=False, case=False)]
+        if not genre_filter.empty:
+            return genre_filter.head(n_recommendations).to_dict('records')
+
+    return []
+
+
+def get_knn_recommendations(movie_title, df, bundle=None, model=None, n_recommendations=5):
+    """Recommandations pour un titre : liste de films (dictionnaires), vide si le film est introuvable"""
+    movie_data = find_movie_by_name(movie_title, df, bundle)
+    if movie_data is None:
+        return []
+    return recommend_movie(movie_data, df, bundle, model, n_recommendations)
+
+
+def recommend_movie(movie_data, df, bundle=None, model=None, n_recommendations=5):
+    """Recommandations pour une ligne du catalogue (movie_data.name est sa position)"""
+    # Voisins précalculés dans le bundle (tenus à jour par les ingestions incrémentales)
+    neighbors = bundle.neighbors if bundle is not None else None
+    if neighbors is not None and n_recommendations <= neighbors.shape[1]:
+        return df.iloc[neighbors[movie_data.name, :n_recommendations]].to_dict('records')
+
+    # Sinon, essayer le modèle KNN sur les features du bundle
+    if model is not None and bundle is not None:
+        try:
+            movie_idx = movie_data.name
+            movie_features = bundle.features[movie_idx:movie_idx + 1]
+            distances, indices = model.kneighbors(movie_features, n_neighbors=n_recommendations + 1)
+            recommended_indices = indices[0][1:]  # Exclure le film lui-même
+            return df.iloc[recommended_indices].to_dict('records')
+        except Exception:
+            pass  # Utiliser silencieusement le système de recommandation alternatif
+
+    # Utiliser le système de recommandation simple comme fallback
+    return get_simple_recommendations(movie_data, df, n_recommendations)
@@ -0,0 +1,88 @@
+"""Micro-benchmark des boucles d'affichage : iterrows / iloc contre la vue colonnaire du catalogue
+
+Usage :
+    python -m cinecreuse.renderbench [--cards 10000] [--repeat 3] [--out artifacts/catalog] [--json resultats.json]
+
+Construit le HTML de `--cards` cartes du Catalogue de quatre façons : `iterrows()` sur les lignes
+sélectionnées, `iloc[i]` film par film (boucles d'origine), tuples de la vue colonnaire (CatalogView)
+et cache de cartes déjà rempli. Le meilleur temps de `--repeat` essais est retenu.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from cinecreuse.bundle import DEFAULT_BUNDLE_ROOT, CatalogBundle
+from cinecreuse.cards import CARD_FIELDS, CardCache, card_body_html
+from cinecreuse.shared import SharedCatalog
+
+VARIANT = 'catalogue'
+
+
+def _iterrows(catalog, positions):
+    return [card_body_html(movie, VARIANT) for _, movie in catalog.frame.iloc[positions].iterrows()]
+
+
+def _iloc(catalog, positions):
+    frame = catalog.frame
+    return [card_body_html(frame.iloc[position], VARIANT) for position in positions]
+
+
+def _columnar(catalog, positions):
+    fields = CARD_FIELDS[VARIANT]
+    return [card_body_html(dict(zip(fields, values)), VARIANT) for values in catalog.view.rows(positions, fields)]
+
+
+def _best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(root=DEFAULT_BUNDLE_ROOT, n_cards=10000, repeat=3, seed=0):
+    """Temps (s) de construction de `n_cards` cartes pour chaque méthode"""
+    catalog = SharedCatalog(CatalogBundle.open_current(root).attach())
+    positions = np.random.default_rng(seed).integers(0, len(catalog), size=n_cards)
+    catalog.view.rows(positions[:1], CARD_FIELDS[VARIANT])  # Conversion des colonnes de chaînes hors mesure
+
+    # Les trois méthodes doivent produire exactement le même HTML
+    sample = positions[:100]
+    if not _iterrows(catalog, sample) == _iloc(catalog, sample) == _columnar(catalog, sample):
+        raise AssertionError("Les méthodes ne produisent pas le même HTML")
+
+    card_cache = CardCache(max_entries=len(catalog))
+    card_cache.cards(catalog.view, positions, VARIANT, catalog.version)
+    timings = {
+        'iterrows': _best_time(lambda: _iterrows(catalog, positions), repeat),
+        'iloc': _best_time(lambda: _iloc(catalog, positions), repeat),
+        'columnar': _best_time(lambda: _columnar(catalog, positions), repeat),
+        'card_cache': _best_time(lambda: card_cache.cards(catalog.view, positions, VARIANT, catalog.version), repeat),
+    }
+    return {'n_cards': n_cards, 'n_movies': len(catalog), 'timings_s': timings}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût des boucles d'affichage des cartes de films")
+    parser.add_argument('--cards', type=int, default=10000, help="Nombre de cartes construites")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre d'essais par méthode")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Répertoire des bundles")
+    parser.add_argument('--json', help="Fichier où enregistrer le rapport")
+    args = parser.parse_args(argv)
+
+    report = run(args.out, args.cards, args.repeat)
+    reference = report['timings_s']['iterrows']
+    print(f"{report['n_cards']} cartes ({report['n_movies']} films au catalogue)")
+    for method, seconds in report['timings_s'].items():
+        print(f"  {method:<11} {seconds * 1000:>9.1f} ms  {seconds / report['n_cards'] * 1e6:>7.1f} µs/carte"
+              f"  ×{reference / seconds:.1f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
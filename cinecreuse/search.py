@@ -0,0 +1,106 @@
+"""Recherche plein texte dans les synopsis avec un classement BM25"""
+import re
+import unicodedata
+
+import numpy as np
+
+# Paramètres BM25 classiques
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Mots vides français et anglais ignorés à l'indexation
+STOPWORDS = frozenset("""
+a an and are as at be by for from has he her his in is it its of on or she that the their they this to was
+were who will with au aux avec ce ces dans de des du elle en et il ils la le les leur lui mais ne nous on ou
+par pas pour qui sa se ses son sur un une
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Découpe un texte en termes normalisés (minuscules, sans accents ni mots vides)"""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    return [t for t in _TOKEN_RE.findall(text) if len(t) > 1 and t not in STOPWORDS]
+
+
+class BM25Index:
+    """Index inversé compact : postings int32 + fréquences, rangés par terme (format CSR)"""
+
+    def __init__(self, terms, offsets, postings, freqs, doc_lengths):
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.freqs = freqs
+        self.doc_lengths = doc_lengths
+        self.n_docs = len(doc_lengths)
+        self._term_ids = {term: i for i, term in enumerate(terms.tolist())}
+
+        # Précalculs indépendants de la requête
+        doc_freqs = np.diff(offsets)
+        self.idf = np.log1p((self.n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = doc_lengths.mean() if self.n_docs else 0.0
+        if avg_length > 0:
+            self._norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)).astype(np.float32)
+        else:
+            self._norm = np.full(self.n_docs, BM25_K1, dtype=np.float32)
+
+    @classmethod
+    def build(cls, texts):
+        """Construit l'index à partir d'une séquence de textes (un document par film)"""
+        vocabulary = {}
+        term_ids, doc_ids, term_freqs = [], [], []
+        doc_lengths = []
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc_id)
+                term_freqs.append(count)
+
+        # Renuméroter les termes par ordre alphabétique pour un index déterministe
+        terms = np.array(sorted(vocabulary), dtype=str)
+        remap = np.empty(len(vocabulary), dtype=np.int32)
+        for new_id, term in enumerate(terms.tolist()):
+            remap[vocabulary[term]] = new_id
+
+        term_ids = remap[np.asarray(term_ids, dtype=np.int32)] if term_ids else np.empty(0, dtype=np.int32)
+        order = np.argsort(term_ids, kind='stable')
+        postings = np.asarray(doc_ids, dtype=np.int32)[order] if doc_ids else np.empty(0, dtype=np.int32)
+        freqs = np.asarray(term_freqs, dtype=np.int32)[order] if term_freqs else np.empty(0, dtype=np.int32)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+
+        return cls(terms, offsets, postings, freqs, np.asarray(doc_lengths, dtype=np.int32))
+
+    def search(self, query, top_k=50):
+        """Retourne (positions, scores) des documents les plus pertinents, triés par score décroissant"""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        matched = False
+        for token in set(tokenize(query)):
+            term_id = self._term_ids.get(token)
+            if term_id is None:
+                continue
+            matched = True
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.postings[start:end]
+            tf = self.freqs[start:end].astype(np.float32)
+            # Chaque document apparaît au plus une fois par terme : l'indexation directe suffit
+            scores[docs] += self.idf[term_id] * tf * (BM25_K1 + 1) / (tf + self._norm[docs])
+
+        if not matched:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        candidates = np.flatnonzero(scores)
+        if top_k is not None and len(candidates) > top_k:
+            candidates = candidates[np.argpartition(scores[candidates], -top_k)[-top_k:]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return candidates.astype(np.int32), scores[candidates]
@@ -0,0 +1,101 @@
+"""Catalogue partagé en lecture seule entre toutes les sessions d'un processus"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Colonnes lues par les boucles d'affichage (cartes, carrousels)
+DISPLAY_COLUMNS = ('movie_id', 'title_x', 'poster_path', 'averageRating', 'year', 'runtime', 'genres_x')
+
+
+def _readonly(array):
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
+
+
+class SharedCatalog:
+    """Colonnes du catalogue construites une seule fois et partagées sans copie
+
+    Les données sont des tableaux NumPy protégés en écriture (numériques, dates, chaînes objet et codes
+    des colonnes catégorielles) ; avec un bundle attaché, les numériques pointent directement sur le
+    fichier mappé, partagé entre workers. Les chaînes Arrow (pandas 3) sont immuables.
+
+    Les pages ne reçoivent jamais le DataFrame partagé lui-même : `frame` en donne une copie
+    superficielle, qui référence les mêmes tableaux sans les copier. Ajouter une colonne, trier ou
+    réindexer en place ne change que cette copie ; écrire une valeur lève une erreur (ou, avec le
+    copy-on-write de pandas, copie la colonne concernée) sans jamais toucher aux autres sessions.
+    """
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        self.version = bundle.version
+
+        columns = {}
+        for name, column in bundle.frame().items():
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes = _readonly(column.cat.codes.to_numpy())
+                columns[name] = pd.Categorical.from_codes(codes, dtype=column.dtype)
+            elif column.dtype.kind in 'biufmMO':
+                columns[name] = _readonly(column.to_numpy())
+            else:
+                columns[name] = column.array
+        self._frame = pd.DataFrame(columns, copy=False)
+        self.view = CatalogView(self._frame, bundle)
+
+    def __len__(self):
+        return len(self._frame)
+
+    @property
+    def frame(self):
+        """Copie superficielle du catalogue, propre à l'appelant (aucune donnée n'est copiée)"""
+        return self._frame.copy(deep=False)
+
+
+class CatalogView:
+    """Vue colonnaire en lecture seule : un tableau NumPy par colonne, lu par position ou par movie_id
+
+    Remplace `iterrows()` et `iloc[i]` dans les boucles d'affichage, qui construisent une Series par
+    film : seules les colonnes demandées sont lues, sous forme de tuples de valeurs. Les colonnes
+    numériques sont celles du catalogue partagé (sans copie) ; les chaînes sont converties une fois,
+    au premier accès.
+    """
+
+    def __init__(self, frame, bundle=None):
+        self.frame = frame
+        self.bundle = bundle
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            with self._lock:
+                column = self._columns.get(name)
+                if column is None:
+                    column = self._columns[name] = _readonly(self.frame[name].to_numpy())
+        return column
+
+    def rows(self, positions, fields=DISPLAY_COLUMNS):
+        """Tuples (un par film) des valeurs de `fields` pour les films aux positions données"""
+        positions = np.asarray(positions, dtype=np.intp)
+        return zip(*(self[name][positions].tolist() for name in fields))
+
+    def record(self, position, fields=DISPLAY_COLUMNS):
+        """Valeurs de `fields` pour un film, dans un dictionnaire"""
+        return {name: self[name][position] for name in fields}
+
+    def position_of(self, movie_id):
+        """Position d'un film à partir de son movie_id (index des identifiants du bundle)"""
+        if self.bundle is not None:
+            return self.bundle.position_of(movie_id)
+        matches = np.flatnonzero(self['movie_id'] == movie_id)
+        return int(matches[0]) if len(matches) else None
+
+    def by_id(self, movie_id, fields=DISPLAY_COLUMNS):
+        """Valeurs de `fields` pour un film désigné par son movie_id (None s'il est inconnu)"""
+        position = self.position_of(movie_id)
+        return None if position is None else self.record(position, fields)
@@ -0,0 +1,78 @@
+"""Ingestion en flux pour les catalogues plus gros que la RAM
+
+Le CSV est lu par blocs ; chaque bloc est nettoyé puis filtré avant le dédoublonnage, qui
+s'appuie sur des tableaux triés de clés 64 bits partagés entre les blocs. La mémoire dépend donc
+de la taille d'un bloc et du nombre de films conservés, pas de la taille du fichier source.
+
+Comme clean_movies(), les filtres (durée, note...) sont appliqués avant le dédoublonnage, d'abord
+sur (titre, date de sortie) puis sur movie_id : le résultat ne dépend pas de la taille des blocs.
+"""
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cinecreuse.catalog import SOURCE_COLUMNS, add_count, filter_movies, prepare_movies, select_catalog_columns
+
+# Nombre de lignes du CSV lues par bloc
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def _contains(sorted_keys, keys):
+    """Masque des `keys` présentes dans le tableau trié `sorted_keys`"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[idx] == keys
+
+
+def iter_clean_chunks(source, chunksize=DEFAULT_CHUNKSIZE, stats=None):
+    """Itère sur les blocs nettoyés et dédoublonnés du CSV source"""
+    if stats is None:
+        stats = {}
+    seen_keys = np.empty(0, dtype=np.uint64)
+    seen_ids = np.empty(0, dtype=np.int64)
+
+    reader = pd.read_csv(source, chunksize=chunksize, usecols=lambda col: col in SOURCE_COLUMNS)
+    for chunk in reader:
+        add_count(stats, 'rows_read', len(chunk))
+        chunk = filter_movies(prepare_movies(chunk), stats)
+
+        rows = len(chunk)
+        keys = pd.util.hash_pandas_object(chunk[['title_x', 'release_date']], index=False).to_numpy()
+        chunk = chunk[~(pd.Series(keys).duplicated().to_numpy() | _contains(seen_keys, keys))]
+        seen_keys = np.union1d(seen_keys, keys)
+
+        # Le dédoublonnage par movie_id porte sur les films restants, comme le second drop_duplicates()
+        ids = chunk['movie_id'].to_numpy()
+        chunk = chunk[~(pd.Series(ids).duplicated().to_numpy() | _contains(seen_ids, ids))]
+        seen_ids = np.union1d(seen_ids, ids)
+        add_count(stats, 'dropped_duplicates', rows - len(chunk))
+        add_count(stats, 'rows_kept', len(chunk))
+        yield select_catalog_columns(chunk)
+
+
+def stream_to_partitions(source, out_dir, chunksize=DEFAULT_CHUNKSIZE, stats=None):
+    """Écrit le catalogue nettoyé en partitions Parquet (une par bloc non vide) et retourne leurs chemins"""
+    out_dir = Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    paths = []
+    for chunk in iter_clean_chunks(source, chunksize, stats):
+        if chunk.empty:
+            continue
+        path = out_dir / f'part-{len(paths):05d}.parquet'
+        chunk.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def read_partitions(paths):
+    """Relit les partitions en un seul DataFrame (films conservés uniquement)"""
+    frames = [pd.read_parquet(path) for path in paths]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,44 @@
+"""Listes des films les mieux notés, globales et par genre"""
+import numpy as np
+
+# Sélections par genre de la page d'accueil : titre affiché -> genre du vocabulaire du catalogue
+HOME_GENRES = {
+    "Action": "Action",
+    "Comédie": "Comedy",
+    "Drame": "Drama",
+    "Horreur": "Horror",
+    "Romance": "Romance",
+    "Thriller": "Thriller",
+    "Aventure": "Adventure",
+    "Science-Fiction": "Sci-Fi",
+}
+
+# Nombre de films par carrousel de la page d'accueil (3 pages de 6)
+HOME_TOP_N = 18
+
+# Nombre de films du carrousel « Les plus populaires »
+POPULAR_TOP_N = 12
+
+# Longueur des tops précalculés dans le bundle
+TOP_LIST_SIZE = 100
+
+
+def rating_order(ratings):
+    """Positions triées par note décroissante (ex æquo dans l'ordre du catalogue, notes absentes exclues)"""
+    ratings = np.asarray(ratings, dtype=np.float64)
+    order = np.argsort(-ratings, kind='stable')
+    return order[~np.isnan(ratings[order])].astype(np.int32)
+
+
+def build_top_lists(ratings, genre_matrix, size=TOP_LIST_SIZE):
+    """Top des films les mieux notés, global et par genre
+
+    Retourne (positions int32 de taille <= size, matrice genres x size complétée par -1).
+    """
+    order = rating_order(ratings)
+    by_genre = np.full((genre_matrix.shape[1], size), -1, dtype=np.int32)
+    in_genre = np.asarray(genre_matrix)[order].astype(bool)
+    for g in range(genre_matrix.shape[1]):
+        top = order[in_genre[:, g]][:size]
+        by_genre[g, :len(top)] = top
+    return order[:size], by_genre
@@ -0,0 +1,178 @@
+"""Préchauffage des caches avant de servir le trafic
+
+Usage :
+    python -m cinecreuse.warmup [--source CSV] [--out artifacts/catalog] [--model KNN.joblib]
+    python -m cinecreuse.warmup --check [--port 5000]
+
+En ligne de commande (par exemple à l'étape de build d'un déploiement), le bundle est construit si
+besoin (tops de la page d'accueil compris), ses fichiers sont chargés dans le cache du système et
+les agrégats de la page KPI sont enregistrés dans le cache disque. Dans l'application, WarmUp exécute les mêmes
+chargements dans un thread d'arrière-plan dès le démarrage du processus.
+
+Chaque processus de l'application écrit l'avancement de son préchauffage dans un fichier d'état
+propre à son port (.cache/warmup-<port>.json). `--check --port N` en fait une sonde de disponibilité
+du serveur de ce port : code de sortie 0 seulement si son préchauffage est terminé sans erreur.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from cinecreuse.bundle import DEFAULT_BUNDLE_ROOT
+from cinecreuse.catalog import DEFAULT_SOURCE
+from cinecreuse.diskcache import DiskCache
+from cinecreuse.features import DEFAULT_MODEL_PATH
+from cinecreuse.ingest import ensure_bundle
+from cinecreuse.kpi import catalog_kpis
+
+# Taille d'une page mémoire, pour forcer la lecture des fichiers mappés
+PAGE_SIZE = 4096
+
+# Répertoire des fichiers d'état du préchauffage (un par port de l'application)
+STATUS_DIR = '.cache'
+
+# Port par défaut de l'application (.streamlit/config.toml)
+DEFAULT_PORT = 5000
+
+
+class WarmUp:
+    """Exécute des étapes de chargement (nom, fonction) dans un thread et signale la fin via `ready`
+
+    Une étape en échec n'interrompt pas les suivantes : l'erreur est conservée dans `errors` et sera
+    de nouveau rencontrée (et affichée) par la première page qui en a besoin. Avec `status_path`,
+    l'état (en cours, terminé, durées, erreurs) est aussi écrit dans un fichier JSON.
+    """
+
+    def __init__(self, steps, status_path=None):
+        self.steps = list(steps)
+        self.status_path = status_path
+        self.ready = threading.Event()
+        self.timings = {}
+        self.errors = {}
+
+    def run(self):
+        self.write_status()
+        for name, step in self.steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = repr(e)
+            self.timings[name] = time.perf_counter() - start
+        self.ready.set()
+        self.write_status()
+        return self
+
+    def write_status(self):
+        """Remplace atomiquement le fichier d'état (rien à faire sans `status_path`)"""
+        if self.status_path is None:
+            return
+        path = Path(self.status_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'pid': os.getpid(),
+                'ready': self.is_ready,
+                'timings_s': {name: round(seconds, 3) for name, seconds in self.timings.items()},
+                'errors': self.errors,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def start(self):
+        """Lance le préchauffage en arrière-plan et retourne immédiatement"""
+        threading.Thread(target=self.run, name='cinecreuse-warmup', daemon=True).start()
+        return self
+
+    @property
+    def is_ready(self):
+        return self.ready.is_set()
+
+    def wait(self, timeout=None):
+        """Attend la fin du préchauffage ; retourne False si `timeout` expire avant"""
+        return self.ready.wait(timeout)
+
+
+def status_path(port=DEFAULT_PORT):
+    """Fichier d'état du préchauffage du serveur écoutant sur `port`"""
+    return Path(STATUS_DIR) / f'warmup-{port}.json'
+
+
+def read_status(path):
+    """État du préchauffage d'un processus encore en vie, ou None (pas démarré, processus arrêté)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            status = json.load(f)
+        os.kill(status['pid'], 0)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return status
+
+
+def touch_pages(bundle):
+    """Lit une valeur par page de chaque fichier du bundle pour le charger dans le cache du système"""
+    for array in bundle.arrays().values():
+        flat = np.asarray(array).reshape(-1).view(np.uint8)
+        int(flat[::PAGE_SIZE].sum())
+    bundle.frame()
+
+
+def warm_up_steps(source=DEFAULT_SOURCE, root=DEFAULT_BUNDLE_ROOT, model_path=DEFAULT_MODEL_PATH, cache=None):
+    """Étapes de préchauffage hors Streamlit : bundle, pages mappées, modèle, index et agrégats"""
+    import joblib
+
+    cache = cache or DiskCache()
+    state = {}
+
+    def bundle():
+        state['bundle'] = ensure_bundle(source, root).attach()
+        state['frame'] = state['bundle'].frame()
+
+    def aggregates():
+        cache.get_or_compute(catalog_kpis, state['bundle'].content_hash, state['frame'])
+
+    return [
+        ('bundle', bundle),
+        ('pages', lambda: touch_pages(state['bundle'])),
+        ('model', lambda: joblib.load(model_path, mmap_mode='r')),
+        ('synopsis_index', lambda: state['bundle'].synopsis_index()),
+        ('aggregates', aggregates),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Préchauffage des caches de CinéCreuse+")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="CSV source du catalogue")
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_ROOT, help="Racine des bundles versionnés")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="Modèle KNN (joblib)")
+    parser.add_argument('--check', action='store_true',
+                        help="Sonde : code 0 si le préchauffage de l'application est terminé")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port du serveur vérifié par --check")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        status = read_status(status_path(args.port))
+        if status is None:
+            print("non démarré")
+            return 1
+        if not status['ready']:
+            print("en cours")
+            return 1
+        for name, error in status['errors'].items():
+            print(f"erreur {name} : {error}")
+        print("prêt" if not status['errors'] else "terminé avec erreurs")
+        return 1 if status['errors'] else 0
+
+    warm_up = WarmUp(warm_up_steps(args.source, args.out, args.model)).run()
+    for name, seconds in warm_up.timings.items():
+        status = f"erreur : {warm_up.errors[name]}" if name in warm_up.errors else "ok"
+        print(f"  {name:<15}: {seconds:.3f}s ({status})")
+    return 1 if warm_up.errors else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Composants Streamlit personnalisés de CinéCreuse+ (front-end statique, sans étape de build)"""
@@ -0,0 +1,28 @@
+"""Carrousel d'affiches paginé dans le navigateur
+
+La liste complète des films est envoyée une seule fois ; ◀/▶ changent de page côté client sans
+aucun échange avec le serveur. Seul un clic sur une affiche renvoie une valeur à Streamlit.
+"""
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+_carousel = components.declare_component('cinecreuse_carousel', path=str(Path(__file__).parent / 'frontend'))
+
+
+def carousel(items, key, per_page=6, n_columns=None, total_pages=3):
+    """Affiche un carrousel de films et retourne le dernier film cliqué, ou None
+
+    `items` : liste de dictionnaires {movie_id, title, rating, poster_url, poster_srcset, poster_color}. La valeur retournée est
+    {'movie_id': ..., 'nonce': ...} ; le nonce distingue deux clics successifs sur le même film.
+    Chaque page contient `per_page` films dont les `n_columns` premiers sont affichés.
+    """
+    return _carousel(
+        items=items,
+        per_page=per_page,
+        n_columns=n_columns or per_page,
+        total_pages=total_pages,
+        state_key=key,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,32 @@
+"""Jeux de données synthétiques au format du CSV source"""
+import numpy as np
+import pandas as pd
+import pytest
+
+GENRES = ['Action', 'Comedy', 'Drama', 'Horror', 'Romance', 'Science Fiction']
+WORDS = ['amour', 'guerre', 'espace', 'famille', 'paris', 'heist', 'ghost', 'king', 'island', 'journey']
+
+
+def make_movies(n, seed=0, first_id=1):
+    """DataFrame de `n` films au schéma du CSV source (quelques durées et notes nulles)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(first_id, first_id + n),
+        'title': [f"Film {i}" for i in range(first_id, first_id + n)],
+        'genres': [str(list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False))) for _ in range(n)],
+        'overview': [' '.join(rng.choice(WORDS, size=rng.integers(3, 15))) for _ in range(n)],
+        'release_date': [f"{year}-0{month}-15" for year, month in zip(rng.integers(1950, 2024, n), rng.integers(1, 10, n))],
+        'poster_path': [f"/p{i}.jpg" for i in range(n)],
+        'runtime': rng.choice([0, 85, 95, 110, 130, 150], size=n),
+        'averageRating': np.round(rng.uniform(0, 10, n), 1),
+        'numVotes': rng.integers(10, 100_000, n),
+        'original_language': rng.choice(['en', 'fr', 'es'], size=n),
+    })
+
+
+@pytest.fixture
+def source_csv(tmp_path):
+    """CSV source de 400 films"""
+    path = tmp_path / 'movies.csv'
+    make_movies(400).to_csv(path, index=False)
+    return path
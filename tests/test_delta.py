@@ -0,0 +1,81 @@
+"""Deltas : table des voisins et index des titres patchés, identiques à un recalcul complet"""
+import numpy as np
+import pytest
+
+from cinecreuse.bundle import CatalogBundle, title_index
+from cinecreuse.delta import apply_delta
+from cinecreuse.features import compute_neighbors, standardize
+from cinecreuse.ingest import ingest
+from conftest import make_movies
+
+N_NEIGHBORS = 8
+
+
+@pytest.fixture
+def root(tmp_path, source_csv):
+    """Racine de bundles avec une version ingérée depuis le CSV source"""
+    root = tmp_path / 'catalog'
+    ingest(source_csv, root, n_neighbors=N_NEIGHBORS)
+    return root
+
+
+def _delta_rows(source_csv, root):
+    """Delta mêlant films modifiés (titre, note, genres) et nouveaux films (dont un nouveau genre)"""
+    import pandas as pd
+
+    published = CatalogBundle.open_current(root).frame(['movie_id'])['movie_id']
+    updates = pd.read_csv(source_csv).set_index('id').loc[published.iloc[[0, 5, 17, 42]]].reset_index()
+    updates['title'] = ['Zorro', 'Film 1', 'aaa', 'Film 42 (version longue)']
+    updates['averageRating'] = [9.9, 1.2, 5.0, 7.7]
+    updates['genres'] = "['Drama', 'Western']"
+    appends = make_movies(30, seed=1, first_id=10_000)
+    appends['runtime'] = 100
+    appends['averageRating'] = 6.5
+    return pd.concat([updates, appends], ignore_index=True)
+
+
+def test_patched_indexes_match_recompute(source_csv, root):
+    _, report = apply_delta(_delta_rows(source_csv, root), root)
+    assert report['updated'] == 4 and report['appended'] == 30
+    bundle = CatalogBundle.open_current(root)
+    frame = bundle.frame()
+
+    # Index des titres : mêmes clés et mêmes positions (à titre égal, ordre des positions)
+    keys, positions = title_index(frame['title_x'])
+    np.testing.assert_array_equal(bundle.title_keys, keys)
+    np.testing.assert_array_equal(bundle.title_positions, positions)
+
+    # Voisins : mêmes distances qu'un recalcul sur les features patchées, chaque voisin à la distance annoncée
+    scaled = standardize(np.asarray(bundle.features), np.asarray(bundle.feature_scale))
+    _, expected = compute_neighbors(scaled, N_NEIGHBORS)
+    neighbors, distances = np.asarray(bundle.neighbors), np.asarray(bundle.neighbor_distances)
+    np.testing.assert_allclose(distances, expected, atol=1e-4)
+    actual = np.linalg.norm(scaled[:, None, :] - scaled[neighbors], axis=2)
+    np.testing.assert_allclose(actual, distances, atol=1e-4)
+    assert not np.any(neighbors == np.arange(len(neighbors))[:, None])
+
+
+def test_delta_matches_fresh_ingest(source_csv, root):
+    apply_delta(_delta_rows(source_csv, root), root)
+    patched = CatalogBundle.open_current(root)
+
+    # Reconstruction complète depuis le CSV : le delta est rejoué
+    _, report = ingest(source_csv, root, n_neighbors=N_NEIGHBORS)
+    assert report['deltas_replayed'] == 1
+    rebuilt = CatalogBundle.open_current(root)
+
+    columns = ['movie_id', 'title_x', 'genres_x', 'averageRating', 'runtime', 'year']
+    left, right = patched.frame(columns), rebuilt.frame(columns)
+    np.testing.assert_array_equal(left['movie_id'], right['movie_id'])
+    np.testing.assert_array_equal(left['title_x'], right['title_x'])
+    np.testing.assert_array_equal(left['genres_x'].astype(str), right['genres_x'].astype(str))
+    np.testing.assert_allclose(left['averageRating'], right['averageRating'])
+    np.testing.assert_array_equal(patched.title_keys, rebuilt.title_keys)
+    np.testing.assert_array_equal(patched.title_positions, rebuilt.title_positions)
+    np.testing.assert_array_equal(patched.synopses.tolist(), rebuilt.synopses.tolist())
+
+    # Mêmes genres par film, quel que soit l'ordre du vocabulaire
+    def genre_sets(bundle):
+        matrix = np.asarray(bundle.genre_matrix).astype(bool)
+        return [frozenset(np.asarray(bundle.genres)[row]) for row in matrix]
+    assert genre_sets(patched) == genre_sets(rebuilt)
@@ -0,0 +1,53 @@
+"""Facettes du Catalogue : comptes par bitmap face à un groupby pandas"""
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cinecreuse.facets import MIN_FACET_YEAR, CatalogFacets
+
+GENRES = ['Action', 'Comedy', 'Drama', 'Horror']
+
+
+@pytest.fixture
+def catalog():
+    """Bundle minimal (genres) et colonne d'années, avec années absentes et aberrantes ; taille non multiple de 8"""
+    rng = np.random.default_rng(0)
+    n = 1003
+    genre_matrix = (rng.random((n, len(GENRES))) < 0.3).astype(np.uint8)
+    year = rng.integers(1890, 2025, n).astype(np.float32)
+    year[rng.random(n) < 0.05] = np.nan
+    bundle = SimpleNamespace(genres=GENRES, genre_matrix=genre_matrix)
+    return bundle, pd.DataFrame({'year': year})
+
+
+def _expected(bundle, frame, genre, year, positions):
+    """Comptes attendus : chaque facette filtrée par les autres filtres actifs seulement"""
+    genres = pd.DataFrame(bundle.genre_matrix.astype(bool), columns=GENRES)
+    base = pd.Series(False, index=frame.index)
+    base.iloc[positions if positions is not None else slice(None)] = True
+    in_year = frame['year'] == year if year is not None else True
+    in_genre = genres[genre] if genre is not None else True
+
+    genre_counts = genres[base & in_year].sum().astype(int).to_dict()
+    years = frame.loc[base & in_genre, 'year'].dropna().astype(int)
+    year_counts = years[years > MIN_FACET_YEAR].groupby(years).size().to_dict()
+    return genre_counts, year_counts
+
+
+@pytest.mark.parametrize('genre, year, with_positions', [
+    (None, None, False), ('Drama', None, False), (None, 2001, False), ('Comedy', 1999, False),
+    (None, None, True), ('Horror', 2010, True),
+])
+def test_counts_match_groupby(catalog, genre, year, with_positions):
+    bundle, frame = catalog
+    positions = np.random.default_rng(1).choice(len(frame), 400, replace=False) if with_positions else None
+    facets = CatalogFacets.build(bundle, frame)
+
+    genre_counts, year_counts = facets.counts(genre, year, positions)
+    expected_genres, expected_years = _expected(bundle, frame, genre, year, positions)
+    assert genre_counts == expected_genres
+    assert {y: n for y, n in year_counts.items() if n} == expected_years
+    assert list(year_counts) == sorted(year_counts, reverse=True)
+    assert min(year_counts) > MIN_FACET_YEAR
@@ -0,0 +1,69 @@
+"""Index BM25 des synopsis : disposition CSR et scores face au calcul direct"""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from cinecreuse.search import BM25_B, BM25_K1, BM25Index, tokenize
+
+TEXTS = [
+    "Un voleur prépare le casse du siècle à Paris",
+    "A ghost haunts the island, a ghost story",
+    "",
+    "Paris, Paris : une histoire d'amour et de guerre",
+    None,
+    "The king's journey across the island",
+    "Amour, amour, amour",
+]
+
+
+def _reference_scores(texts, query):
+    """Scores BM25 calculés document par document, sans index"""
+    docs = [Counter(tokenize(text)) for text in texts]
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = sum(lengths) / len(docs)
+    scores = np.zeros(len(docs))
+    for term in set(tokenize(query)):
+        df = sum(term in doc for doc in docs)
+        idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        for i, doc in enumerate(docs):
+            tf = doc[term]
+            if tf:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / avg_length)
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return scores
+
+
+def test_csr_layout():
+    index = BM25Index.build(TEXTS)
+    assert list(index.terms) == sorted(index.terms)
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(index.postings) == len(index.freqs)
+    assert np.all(np.diff(index.offsets) > 0)
+
+    for term_id, term in enumerate(index.terms.tolist()):
+        start, end = index.offsets[term_id], index.offsets[term_id + 1]
+        postings = index.postings[start:end]
+        expected = {doc: Counter(tokenize(text))[term] for doc, text in enumerate(TEXTS) if term in tokenize(text)}
+        assert np.all(np.diff(postings) > 0)
+        assert dict(zip(postings.tolist(), index.freqs[start:end].tolist())) == expected
+    assert index.doc_lengths.tolist() == [len(tokenize(text)) for text in TEXTS]
+
+
+@pytest.mark.parametrize('query', ["ghost island", "Paris amour", "casse du siècle", "king", "inconnu"])
+def test_scores_match_reference(query):
+    index = BM25Index.build(TEXTS)
+    positions, scores = index.search(query, top_k=None)
+    reference = _reference_scores(TEXTS, query)
+
+    assert sorted(positions.tolist()) == np.flatnonzero(reference).tolist()
+    np.testing.assert_allclose(scores, reference[positions], rtol=1e-5)
+    assert np.all(np.diff(scores) <= 0)
+
+
+def test_top_k_keeps_best_scores():
+    index = BM25Index.build(TEXTS)
+    all_positions, all_scores = index.search("amour paris island", top_k=None)
+    positions, scores = index.search("amour paris island", top_k=2)
+    np.testing.assert_allclose(scores, all_scores[:2])
+    assert set(positions.tolist()) <= set(all_positions.tolist())